@@ -0,0 +1,46 @@
+"""Add content_sha256 to media for upload deduplication
+
+Revision ID: 5b8e2f4a9c61
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-19 10:02:17.554920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f4a9c61'
+down_revision: Union[str, None] = 'a3f1c9d2e7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add content hash column and let identical content share one asset"""
+    op.add_column('media', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+    # Uploads made since streaming ingest recorded the hash in file_metadata
+    connection = op.get_bind()
+    connection.execute(sa.text("""
+        UPDATE media SET content_sha256 = file_metadata->>'content_sha256'
+        WHERE content_sha256 IS NULL AND file_metadata->>'content_sha256' IS NOT NULL
+    """))
+
+    op.create_index('ix_media_content_sha256', 'media', ['content_sha256'])
+
+    # Several media rows may now point at the same remote asset
+    op.drop_constraint('uq_media_cloudinary_public_id', 'media', type_='unique')
+    op.create_index('ix_media_cloudinary_public_id', 'media', ['cloudinary_public_id'])
+
+
+def downgrade() -> None:
+    """Remove content hash column and restore unique public ids"""
+    op.drop_index('ix_media_cloudinary_public_id', 'media')
+    op.create_unique_constraint(
+        'uq_media_cloudinary_public_id', 'media', ['cloudinary_public_id']
+    )
+    op.drop_index('ix_media_content_sha256', 'media')
+    op.drop_column('media', 'content_sha256')
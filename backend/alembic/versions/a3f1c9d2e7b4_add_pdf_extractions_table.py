@@ -0,0 +1,41 @@
+"""Add pdf_extractions table for content-addressed PDF extraction cache
+
+Revision ID: a3f1c9d2e7b4
+Revises: 132ef6a8f08d
+Create Date: 2026-10-19 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e7b4'
+down_revision: Union[str, None] = '132ef6a8f08d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create pdf_extractions keyed by SHA-256 of the PDF bytes"""
+    op.create_table(
+        'pdf_extractions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_sha256', sa.String(length=64), nullable=False),
+        sa.Column('text', sa.Text(), nullable=True),
+        sa.Column('file_metadata', sa.JSON(), nullable=True),
+        sa.Column('page_count', sa.Integer(), nullable=True),
+        sa.Column('word_count', sa.Integer(), nullable=True),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('content_sha256', name='uq_pdf_extractions_content_sha256'),
+    )
+
+
+def downgrade() -> None:
+    """Drop pdf_extractions"""
+    op.drop_table('pdf_extractions')
@@ -0,0 +1,49 @@
+"""Add indexed tag array to experiences
+
+Revision ID: a8e1d5f3b962
+Revises: f3a6c8e2d417
+Create Date: 2026-10-19 17:26:53.104772
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e1d5f3b962'
+down_revision: Union[str, None] = 'f3a6c8e2d417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add generated text[] of tags and GIN index"""
+    # Generated from the comma-separated tags string: computed for existing
+    # rows when added (the backfill) and kept current on every write
+    op.add_column(
+        'experiences',
+        sa.Column(
+            'tag_list',
+            postgresql.ARRAY(sa.Text()),
+            sa.Computed(
+                "coalesce(array_remove(regexp_split_to_array(btrim(tags), '\\s*,\\s*'), ''), '{}')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_experiences_tag_list',
+        'experiences',
+        ['tag_list'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Remove tag array and index"""
+    op.drop_index('ix_experiences_tag_list', 'experiences')
+    op.drop_column('experiences', 'tag_list')
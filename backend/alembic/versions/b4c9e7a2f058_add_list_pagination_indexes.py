@@ -0,0 +1,56 @@
+"""Add (created_at, id) indexes for keyset pagination of list endpoints
+
+Revision ID: b4c9e7a2f058
+Revises: a8e1d5f3b962
+Create Date: 2026-10-19 18:04:37.651920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c9e7a2f058'
+down_revision: Union[str, None] = 'a8e1d5f3b962'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, leading columns before created_at DESC, id DESC)
+PAGINATION_INDEXES = [
+    ('ix_experiences_created', 'experiences', []),
+    ('ix_clients_created', 'clients', []),
+    ('ix_contacts_created', 'contacts', []),
+    ('ix_project_proposals_created', 'project_proposals', []),
+    ('ix_projects_created', 'projects', []),
+    ('ix_resumes_created', 'resumes', []),
+    ('ix_user_profiles_created', 'user_profiles', []),
+    ('ix_user_profiles_user_created', 'user_profiles', ['user_id']),
+]
+TABLES = sorted({table for _name, table, _leading in PAGINATION_INDEXES})
+
+
+def upgrade() -> None:
+    """Make created_at non-null and index the (created_at, id) sort key"""
+    for table in TABLES:
+        # Rows without a creation time would break keyset pagination
+        op.execute(
+            f"UPDATE {table} SET created_at = coalesce(updated_at, now()) "
+            "WHERE created_at IS NULL"
+        )
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+    for name, table, leading in PAGINATION_INDEXES:
+        op.create_index(
+            name, table, [*leading, sa.text('created_at DESC'), sa.text('id DESC')]
+        )
+
+
+def downgrade() -> None:
+    """Remove pagination indexes and allow null created_at again"""
+    for name, table, _leading in reversed(PAGINATION_INDEXES):
+        op.drop_index(name, table)
+    for table in TABLES:
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,37 @@
+"""Add composite index for paginated project sheet listing
+
+Revision ID: b7c2e9f15a83
+Revises: e4d7a1b6c392
+Create Date: 2026-10-19 13:02:41.770356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2e9f15a83'
+down_revision: Union[str, None] = 'e4d7a1b6c392'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index a user's sheets by creation time, newest first"""
+    op.execute("UPDATE project_sheets SET created_at = now() WHERE created_at IS NULL")
+
+    op.create_index(
+        'ix_project_sheets_generated_by_created',
+        'project_sheets',
+        ['generated_by', sa.text('created_at DESC'), sa.text('id DESC')],
+    )
+    # Covered by the leading column of the composite index
+    op.drop_index('idx_project_sheets_generated_by', 'project_sheets')
+
+
+def downgrade() -> None:
+    """Restore the single-column generated_by index"""
+    op.create_index('idx_project_sheets_generated_by', 'project_sheets', ['generated_by'])
+    op.drop_index('ix_project_sheets_generated_by_created', 'project_sheets')
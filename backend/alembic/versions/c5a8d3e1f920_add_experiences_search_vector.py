@@ -0,0 +1,51 @@
+"""Add weighted full-text search vector to experiences
+
+Revision ID: c5a8d3e1f920
+Revises: b7c2e9f15a83
+Create Date: 2026-10-19 14:37:12.904518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a8d3e1f920'
+down_revision: Union[str, None] = 'b7c2e9f15a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add generated tsvector column and GIN index"""
+    # A stored generated column is computed for existing rows when added,
+    # which backfills it, and kept current by Postgres on every write
+    op.add_column(
+        'experiences',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(project_name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(tags, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(project_description, '')), 'C')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_experiences_search_vector',
+        'experiences',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Remove full-text search column and index"""
+    op.drop_index('ix_experiences_search_vector', 'experiences')
+    op.drop_column('experiences', 'search_vector')
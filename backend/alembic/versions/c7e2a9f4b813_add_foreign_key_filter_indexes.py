@@ -0,0 +1,66 @@
+"""Index foreign keys and filter columns used by hot queries
+
+Revision ID: c7e2a9f4b813
+Revises: b4c9e7a2f058
+Create Date: 2026-10-19 20:41:12.508364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9f4b813'
+down_revision: Union[str, None] = 'b4c9e7a2f058'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns). user_profiles.user_id, media.uploaded_by and
+# project_sheets.generated_by/project_id already lead existing indexes.
+FOREIGN_KEY_INDEXES = [
+    ('ix_resumes_project_proposal_id', 'resumes', ['project_proposal_id']),
+    ('ix_experiences_client_id', 'experiences', ['client_id']),
+    # Dropped by 2c51599e6a82
+    ('ix_profile_experiences_user_profile_id', 'profile_experiences', ['user_profile_id']),
+    ('ix_profile_skills_user_profile_id', 'profile_skills', ['user_profile_id']),
+    ('ix_profile_certifications_user_profile_id', 'profile_certifications', ['user_profile_id']),
+    ('ix_profile_education_user_profile_id', 'profile_education', ['user_profile_id']),
+    ('ix_resume_experience_details_experience_id', 'resume_experience_details', ['experience_id']),
+    # Cleared when a media row is deleted
+    ('ix_user_profiles_main_image_id', 'user_profiles', ['main_image_id']),
+    ('ix_projects_main_image_id', 'projects', ['main_image_id']),
+]
+
+
+def upgrade() -> None:
+    """Create the indexes without blocking writes to the tables"""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in FOREIGN_KEY_INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+        op.create_index(
+            'ix_templates_is_default',
+            'templates',
+            ['is_default'],
+            postgresql_where=sa.text('is_default'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove the foreign key and filter indexes"""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_templates_is_default',
+            'templates',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        for name, table, _columns in reversed(FOREIGN_KEY_INDEXES):
+            op.drop_index(name, table, postgresql_concurrently=True, if_exists=True)
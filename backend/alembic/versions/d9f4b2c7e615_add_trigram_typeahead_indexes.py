@@ -0,0 +1,49 @@
+"""Add trigram indexes for typeahead search
+
+Revision ID: d9f4b2c7e615
+Revises: c5a8d3e1f920
+Create Date: 2026-10-19 15:52:41.318206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f4b2c7e615'
+down_revision: Union[str, None] = 'c5a8d3e1f920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, column)
+TRIGRAM_INDEXES = [
+    ('ix_user_profiles_full_name_trgm', 'user_profiles', 'full_name'),
+    ('ix_user_profiles_first_name_trgm', 'user_profiles', 'first_name'),
+    ('ix_user_profiles_last_name_trgm', 'user_profiles', 'last_name'),
+    ('ix_user_profiles_current_title_trgm', 'user_profiles', 'current_title'),
+    ('ix_user_profiles_department_trgm', 'user_profiles', 'department'),
+    ('ix_projects_name_trgm', 'projects', 'name'),
+    ('ix_projects_sheet_description_trgm', 'projects', 'project_sheet_description'),
+    ('ix_clients_client_name_trgm', 'clients', 'client_name'),
+]
+
+
+def upgrade() -> None:
+    """Enable pg_trgm and add GIN trigram indexes on typeahead columns"""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Remove trigram indexes (the pg_trgm extension is left installed)"""
+    for name, table, _column in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table)
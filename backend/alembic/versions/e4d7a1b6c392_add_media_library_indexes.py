@@ -0,0 +1,41 @@
+"""Add composite indexes for paginated media library listing
+
+Revision ID: e4d7a1b6c392
+Revises: 5b8e2f4a9c61
+Create Date: 2026-10-19 11:24:05.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4d7a1b6c392'
+down_revision: Union[str, None] = '5b8e2f4a9c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the media library sort key, with and without a media_type filter"""
+    # Legacy rows without an upload time would break keyset pagination
+    op.execute("UPDATE media SET uploaded_at = now() WHERE uploaded_at IS NULL")
+
+    op.create_index(
+        'ix_media_library',
+        'media',
+        ['uploaded_by', 'media_type', sa.text('uploaded_at DESC'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'ix_media_library_all',
+        'media',
+        ['uploaded_by', sa.text('uploaded_at DESC'), sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    """Remove media library indexes"""
+    op.drop_index('ix_media_library_all', 'media')
+    op.drop_index('ix_media_library', 'media')
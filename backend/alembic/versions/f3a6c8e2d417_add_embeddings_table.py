@@ -0,0 +1,47 @@
+"""Add embeddings table for semantic proposal matching
+
+Revision ID: f3a6c8e2d417
+Revises: d9f4b2c7e615
+Create Date: 2026-10-19 16:41:08.527390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6c8e2d417'
+down_revision: Union[str, None] = 'd9f4b2c7e615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create embeddings keyed by entity and embedding model"""
+    op.create_table(
+        'embeddings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=32), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('model', sa.String(length=200), nullable=False),
+        sa.Column('dimensions', sa.Integer(), nullable=False),
+        sa.Column('content_sha256', sa.String(length=64), nullable=False),
+        sa.Column('vector', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_embeddings_entity_model',
+        'embeddings',
+        ['entity_type', 'model', 'entity_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop embeddings"""
+    op.drop_index('ix_embeddings_entity_model', 'embeddings')
+    op.drop_table('embeddings')
@@ -1,9 +1,31 @@
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, undefer
 
 from . import models, schemas
+from .pagination import DEFAULT_PAGE_SIZE, keyset_paginate
+from .search import (
+    PROFILE_SEARCH_COLUMNS,
+    PROJECT_SEARCH_COLUMNS,
+    set_similarity_threshold,
+    typeahead_filter,
+    typeahead_score,
+)
 from .services.auth_service import auth_service
+from .services.embeddings import EXPERIENCE, PROPOSAL, embedding_service
+
+
+def _newest_first_page(query, model, cursor: Optional[str], limit: int):
+    """
+    One keyset page of a query, newest first on (created_at, id).
+
+    Returns (rows, next_cursor); raises InvalidCursor for a bad cursor.
+    """
+    return keyset_paginate(
+        query, [model.created_at, model.id], cursor=cursor, limit=limit
+    )
 
 
 def get_experience(db: Session, experience_id: int):
@@ -14,25 +36,115 @@ def get_experience(db: Session, experience_id: int):
     )
 
 
-def get_experiences(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Experience).offset(skip).limit(limit).all()
+def _filter_experience_tags(query, tags: Optional[List[str]]):
+    # Experiences having every requested tag (exact match, GIN-indexed @>)
+    if tags:
+        query = query.filter(models.Experience.tag_list.contains(tags))
+    return query
 
 
-def search_experiences(db: Session, q: str, skip: int = 0, limit: int = 100):
-    query = db.query(models.Experience)
-    like = f"%{q}%"
+def get_experiences(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    tags: Optional[List[str]] = None,
+):
+    query = _filter_experience_tags(db.query(models.Experience), tags)
+    return _newest_first_page(query, models.Experience, cursor, limit)
+
+
+def get_experience_tag_counts(
+    db: Session, tags: Optional[List[str]] = None, limit: int = 100
+):
+    """(tag, count) of experiences per tag, optionally within a tag filter"""
+    experience_tags = _filter_experience_tags(
+        db.query(func.unnest(models.Experience.tag_list).label("tag")), tags
+    ).subquery()
+    count = func.count().label("count")
     return (
-        query.filter(
-            (models.Experience.project_name.ilike(like))
-            | (models.Experience.project_description.ilike(like))
-            | (models.Experience.tags.ilike(like))
-        )
+        db.query(experience_tags.c.tag, count)
+        .group_by(experience_tags.c.tag)
+        .order_by(count.desc(), experience_tags.c.tag)
+        .limit(limit)
+        .all()
+    )
+
+
+# Text search configuration; must match the one in Experience.search_vector
+SEARCH_CONFIG = "english"
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+# Snippets are HTML; only the <mark> highlights may be markup
+HTML_ESCAPES = [("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#39;")]
+
+
+def _html_escape_sql(text):
+    """SQL expression escaping text for HTML; the parser skips the entities"""
+    for char, entity in HTML_ESCAPES:
+        text = func.replace(text, char, entity)
+    return text
+
+
+def _experience_tsquery(q: str):
+    # websearch_to_tsquery accepts free text ("quoted phrases", -exclusions,
+    # OR) and never raises on malformed input
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+
+def search_experiences(
+    db: Session,
+    q: str,
+    skip: int = 0,
+    limit: int = 100,
+    tags: Optional[List[str]] = None,
+):
+    """Full-text search over experiences, best matches first"""
+    tsquery = _experience_tsquery(q)
+    rank = func.ts_rank(models.Experience.search_vector, tsquery)
+    query = db.query(models.Experience).filter(
+        models.Experience.search_vector.op("@@")(tsquery)
+    )
+    return (
+        _filter_experience_tags(query, tags)
+        .order_by(rank.desc(), models.Experience.id)
         .offset(skip)
         .limit(limit)
         .all()
     )
 
 
+def search_experiences_ranked(db: Session, q: str, skip: int = 0, limit: int = 20):
+    """
+    Full-text search returning (experience, rank, snippet) rows.
+
+    Matching and ranking use the GIN-indexed search vector; highlighted
+    snippets are only generated for the requested page, since ts_headline
+    re-parses the document text. The text is HTML-escaped before
+    highlighting, so the <mark> tags are the snippet's only markup.
+    """
+    tsquery = _experience_tsquery(q)
+    rank = func.ts_rank(models.Experience.search_vector, tsquery)
+    page = (
+        db.query(models.Experience.id.label("id"), rank.label("rank"))
+        .filter(models.Experience.search_vector.op("@@")(tsquery))
+        .order_by(rank.desc(), models.Experience.id)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        _html_escape_sql(func.coalesce(models.Experience.project_description, "")),
+        tsquery,
+        SNIPPET_OPTIONS,
+    )
+    return (
+        db.query(models.Experience, page.c.rank, snippet.label("snippet"))
+        .join(page, page.c.id == models.Experience.id)
+        .order_by(page.c.rank.desc(), models.Experience.id)
+        .all()
+    )
+
+
 def create_experience(db: Session, experience: schemas.ExperienceCreate):
     db_exp = models.Experience(**experience.dict())
     db.add(db_exp)
@@ -59,6 +171,7 @@ def delete_experience(db: Session, experience_id: int) -> bool:
     db_exp = get_experience(db, experience_id)
     if not db_exp:
         return False
+    embedding_service.delete_embeddings(db, EXPERIENCE, experience_id)
     db.delete(db_exp)
     db.commit()
     return True
@@ -68,8 +181,10 @@ def get_client(db: Session, client_id: int):
     return db.query(models.Client).filter(models.Client.id == client_id).first()
 
 
-def get_clients(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Client).offset(skip).limit(limit).all()
+def get_clients(
+    db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+):
+    return _newest_first_page(db.query(models.Client), models.Client, cursor, limit)
 
 
 def create_client(db: Session, client: schemas.ClientCreate):
@@ -88,8 +203,10 @@ def create_client(db: Session, client: schemas.ClientCreate):
         raise e
 
 
-def get_contacts(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Contact).offset(skip).limit(limit).all()
+def get_contacts(
+    db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+):
+    return _newest_first_page(db.query(models.Contact), models.Contact, cursor, limit)
 
 
 def get_project_proposal(db: Session, proposal_id: int):
@@ -100,17 +217,14 @@ def get_project_proposal(db: Session, proposal_id: int):
     )
 
 
-def get_project_proposals(db: Session, skip: int = 0, limit: int = 100):
-    return (
-        db.query(models.ProjectProposal)
-        .options(
-            joinedload(models.ProjectProposal.client),
-            joinedload(models.ProjectProposal.contact),
-        )
-        .offset(skip)
-        .limit(limit)
-        .all()
+def get_project_proposals(
+    db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+):
+    query = db.query(models.ProjectProposal).options(
+        joinedload(models.ProjectProposal.client),
+        joinedload(models.ProjectProposal.contact),
     )
+    return _newest_first_page(query, models.ProjectProposal, cursor, limit)
 
 
 def create_project_proposal(db: Session, proposal: schemas.ProjectProposalCreate):
@@ -145,6 +259,7 @@ def delete_project_proposal(db: Session, proposal_id: int):
         .first()
     )
     if db_proposal:
+        embedding_service.delete_embeddings(db, PROPOSAL, proposal_id)
         db.delete(db_proposal)
         db.commit()
         return True
@@ -157,7 +272,12 @@ def get_template_by_name(db: Session, name: str):
 
 def get_default_template(db: Session):
     """Get the default template marked with is_default=True"""
-    return db.query(models.Template).filter(models.Template.is_default == True).first()
+    return (
+        db.query(models.Template)
+        .options(undefer(models.Template.content))
+        .filter(models.Template.is_default == True)
+        .first()
+    )
 
 
 def create_template(db: Session, template: schemas.TemplateCreate):
@@ -186,33 +306,46 @@ def get_user_profile_full(db: Session, profile_id: int):
     return get_user_profile(db, profile_id)
 
 
+def _search_user_profiles(query, q: str, limit: int):
+    # Substring or fuzzy match across name, title and department (trigram
+    # indexed), best matches first
+    return query.filter(typeahead_filter(PROFILE_SEARCH_COLUMNS, q)).order_by(
+        typeahead_score(PROFILE_SEARCH_COLUMNS, q).desc(), models.UserProfile.id
+    ).limit(limit).all()
+
+
 def get_user_profiles(
-    db: Session, skip: int = 0, limit: int = 100, q: str | None = None
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    q: str | None = None,
 ):
+    """
+    Page of profiles, newest first, as (rows, next_cursor).
+
+    With q, the best `limit` matches instead, ranked by similarity
+    (next_cursor is None).
+    """
     query = db.query(models.UserProfile)
     if q:
-        like = f"%{q}%"
-        query = query.filter(models.UserProfile.name.ilike(like))
-    return query.offset(skip).limit(limit).all()
+        set_similarity_threshold(db)
+        return _search_user_profiles(query, q, limit), None
+    return _newest_first_page(query, models.UserProfile, cursor, limit)
 
 
 def get_user_profiles_for_user(
-    db: Session, user_id: int, skip: int = 0, limit: int = 100, q: str | None = None
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    q: str | None = None,
 ):
+    """get_user_profiles limited to one user's profiles"""
     query = db.query(models.UserProfile).filter(models.UserProfile.user_id == user_id)
-    
     if q:
-        like = f"%{q}%"
-        # Search across multiple fields for better results
-        query = query.filter(
-            models.UserProfile.full_name.ilike(like) |
-            models.UserProfile.first_name.ilike(like) |
-            models.UserProfile.last_name.ilike(like) |
-            models.UserProfile.current_title.ilike(like) |
-            models.UserProfile.department.ilike(like)
-        )
-    
-    return query.offset(skip).limit(limit).all()
+        set_similarity_threshold(db)
+        return _search_user_profiles(query, q, limit), None
+    return _newest_first_page(query, models.UserProfile, cursor, limit)
 
 
 def create_user_profile(db: Session, profile: schemas.UserProfileCreate):
@@ -500,14 +633,26 @@ def get_project(db: Session, project_id: int):
     return db.query(models.Project).filter(models.Project.id == project_id).first()
 
 
-def get_projects(db: Session, skip: int = 0, limit: int = 100, q: str | None = None):
+def get_projects(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    q: str | None = None,
+):
+    """
+    Page of projects, newest first, as (rows, next_cursor).
+
+    With q, the best `limit` matches instead, ranked by similarity
+    (next_cursor is None).
+    """
     query = db.query(models.Project)
     if q:
-        like = f"%{q}%"
-        query = query.filter(
-            (models.Project.name.ilike(like)) | (models.Project.description.ilike(like))
-        )
-    return query.offset(skip).limit(limit).all()
+        set_similarity_threshold(db)
+        rows = query.filter(typeahead_filter(PROJECT_SEARCH_COLUMNS, q)).order_by(
+            typeahead_score(PROJECT_SEARCH_COLUMNS, q).desc(), models.Project.id
+        ).limit(limit).all()
+        return rows, None
+    return _newest_first_page(query, models.Project, cursor, limit)
 
 
 def create_project(db: Session, project: schemas.ProjectCreate):
@@ -691,11 +836,18 @@ def delete_resume(db: Session, resume_id: int):
 
 
 def get_resume(db: Session, resume_id: int):
-    return db.query(models.Resume).filter(models.Resume.id == resume_id).first()
+    return (
+        db.query(models.Resume)
+        .options(undefer(models.Resume.generated_content))
+        .filter(models.Resume.id == resume_id)
+        .first()
+    )
 
 
-def get_resumes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Resume).offset(skip).limit(limit).all()
+def get_resumes(
+    db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+):
+    return _newest_first_page(db.query(models.Resume), models.Resume, cursor, limit)
 
 
 def create_user(db: Session, user: schemas.UserCreate) -> models.User:
@@ -769,3 +921,41 @@ def delete_media(db: Session, media_id: int) -> bool:
     db.delete(media)
     db.commit()
     return True
+
+
+# PDF extraction store CRUD
+def get_pdf_extraction(db: Session, content_sha256: str):
+    return (
+        db.query(models.PdfExtraction)
+        .filter(models.PdfExtraction.content_sha256 == content_sha256)
+        .first()
+    )
+
+
+def create_pdf_extraction(
+    db: Session,
+    *,
+    content_sha256: str,
+    text: Optional[str],
+    file_metadata: Optional[dict],
+    page_count: Optional[int],
+    word_count: Optional[int],
+    summary: Optional[str],
+) -> models.PdfExtraction:
+    """Store an extraction; returns the existing row if another request won the race."""
+    extraction = models.PdfExtraction(
+        content_sha256=content_sha256,
+        text=text,
+        file_metadata=file_metadata or {},
+        page_count=page_count,
+        word_count=word_count,
+        summary=summary,
+    )
+    db.add(extraction)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return get_pdf_extraction(db, content_sha256)
+    db.refresh(extraction)
+    return extraction
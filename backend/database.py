@@ -1,8 +1,21 @@
+import bisect
+import itertools
+import logging
 import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 load_dotenv()
 
@@ -12,9 +25,336 @@ if not DATABASE_URL:
         "DATABASE_URL is not set. Please configure your database connection in the environment or .env file."
     )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Connection pool, per process (each uvicorn worker has its own pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Seconds before a pooled connection is replaced; -1 keeps connections forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections with a round-trip on every checkout. Without it, stale
+# connections are only avoided through DB_POOL_RECYCLE.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Server-side limit per statement (Postgres), 0 disables
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# Read replicas, comma-separated; read-only endpoints use them when set
+REPLICA_DATABASE_URLS = [
+    url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()
+]
+# After a client's own write, its reads stay on the primary for this long
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# Replicas further behind than this are skipped in favour of the primary
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+# How long a measured replica lag is trusted before it is checked again
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+
+logger = logging.getLogger("app")
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """Checkout wait times and timeouts of the connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.wait_buckets = [0] * (len(POOL_WAIT_BUCKETS) + 1)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            self.wait_buckets[bisect.bisect_left(POOL_WAIT_BUCKETS, seconds)] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{bound:g}" for bound in POOL_WAIT_BUCKETS] + ["le_inf"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_seconds": self.total_wait_seconds / (self.checkouts or 1),
+                "max_wait_seconds": self.max_wait_seconds,
+                "wait_histogram": dict(zip(labels, self.wait_buckets)),
+            }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+replica_pool_metrics = PoolMetrics()
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waited for a connection"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    metrics = pool_metrics
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+class InstrumentedReplicaQueuePool(_TimedCheckout, QueuePool):
+    metrics = replica_pool_metrics
+
+
+class InstrumentedAsyncReplicaQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics = replica_pool_metrics
+
+
+def _engine_options(url: str, poolclass) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        return options
+
+    options.update(
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+        }
+    elif DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgres"):
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Replay delay of a standby; a replica that has replayed everything it
+# received reports 0 even when the primary has been idle for a while
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class Replica:
+    """A read replica engine and its most recently measured lag"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(
+            url, **_engine_options(url, InstrumentedReplicaQueuePool)
+        )
+        self._async_engine: Optional[AsyncEngine] = None
+        self.lag_seconds: Optional[float] = None  # None while unreachable
+        self.checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def current_lag(self) -> Optional[float]:
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < REPLICA_LAG_CHECK_INTERVAL:
+            return self.lag_seconds
+        # One request measures; concurrent ones use the previous value
+        if not self._lock.acquire(blocking=False):
+            return self.lag_seconds
+        try:
+            self.lag_seconds = self._measure_lag()
+            self.checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self.lag_seconds
+
+    def _measure_lag(self) -> Optional[float]:
+        if self.engine.dialect.name != "postgresql":
+            return 0.0
+        try:
+            with self.engine.connect() as conn:
+                return float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Replica {self.engine.url.host} unavailable: {e}")
+            return None
+
+    def is_usable(self) -> bool:
+        lag = self.current_lag()
+        return lag is not None and lag <= REPLICA_MAX_LAG_SECONDS
+
+    def get_async_engine(self) -> AsyncEngine:
+        """The replica through the asyncio driver, created on first use"""
+        if self._async_engine is None:
+            url = _async_database_url(self.url)
+            self._async_engine = create_async_engine(
+                url, **_engine_options(url, InstrumentedAsyncReplicaQueuePool)
+            )
+        return self._async_engine
+
+
+replicas: List[Replica] = [Replica(url) for url in REPLICA_DATABASE_URLS]
+_replica_counter = itertools.count()
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica and writes to the primary
+
+    Queries go to the replica it was opened with; flushes and explicit
+    INSERT/UPDATE/DELETE statements go to the primary, so a read endpoint
+    that happens to write still works.
+    """
+
+    def __init__(self, *args, replica_bind: Engine, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            return self.bind  # The primary
+        return self.replica_bind
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autoflush=False, bind=engine)
+
+# Set on write responses and echoed back by the client, so the
+# read-your-writes window holds whichever worker serves the next read.
+# The value is the server time (epoch seconds) until which reads go to the
+# primary.
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+
+def read_primary_until() -> str:
+    """Header value starting a read-your-writes window now"""
+    return f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}"
+
+
+def _wrote_recently(request: Request) -> bool:
+    try:
+        until = float(request.headers.get(READ_PRIMARY_HEADER, ""))
+    except ValueError:
+        return False
+    now = time.time()
+    # Values beyond one window were not issued by us; ignore them
+    return now < until <= now + READ_YOUR_WRITES_SECONDS
+
+
+def _choose_replica() -> Optional[Replica]:
+    """Next usable replica, round-robin; None when all lag or are down"""
+    start = next(_replica_counter)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        if replica.is_usable():
+            return replica
+    return None
+
+
+def _async_database_url(url: str) -> str:
+    """The same database through an asyncio driver (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        query = dict(parsed.query)
+        # asyncpg takes ssl=<mode> instead of libpq's sslmode=<mode>
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+# Created on first use, so processes that never serve an async route don't
+# need the async driver
+_async_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: Optional[async_sessionmaker] = None
+_AsyncReadSessionLocal: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal, _AsyncReadSessionLocal
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            **_engine_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool),
+        )
+        # Objects stay readable after commit; lazy loads are not available
+        # on an AsyncSession, so routes load what they need up front
+        _AsyncSessionLocal = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+        _AsyncReadSessionLocal = async_sessionmaker(
+            _async_engine,
+            autoflush=False,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+        )
+    return _async_engine
+
+
+def _pool_state(pool, metrics: Optional[PoolMetrics] = None) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, _TimedCheckout):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=DB_MAX_OVERFLOW,
+            timeout_seconds=DB_POOL_TIMEOUT,
+            recycle_seconds=DB_POOL_RECYCLE,
+            pre_ping=DB_POOL_PRE_PING,
+            statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+        )
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Live pool state and checkout wait metrics for this process"""
+    stats: Dict[str, Any] = {"pid": os.getpid()}
+    stats.update(_pool_state(engine.pool, pool_metrics))
+    if _async_engine is not None:
+        stats["async"] = _pool_state(_async_engine.pool, async_pool_metrics)
+    if replicas:
+        stats["replicas"] = {
+            "pools": [
+                dict(
+                    _pool_state(replica.engine.pool),
+                    host=replica.engine.url.host,
+                    lag_seconds=replica.lag_seconds,
+                )
+                for replica in replicas
+            ],
+            **replica_pool_metrics.snapshot(),
+        }
+    return stats
+
 
 def get_db():
     db = SessionLocal()
@@ -22,3 +362,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints
+
+    Reads from a replica unless this client wrote within the last
+    READ_YOUR_WRITES_SECONDS or no replica is within REPLICA_MAX_LAG_SECONDS,
+    in which case the primary serves them. Without replicas this is get_db.
+    """
+    replica = None
+    if replicas and not _wrote_recently(request):
+        replica = _choose_replica()
+    db = ReadSessionLocal(replica_bind=replica.engine) if replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """AsyncSession dependency for async routes; DB waits don't block the event loop"""
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """AsyncSession for read-only async routes, routed like get_read_db"""
+    get_async_engine()
+    replica = None
+    if replicas and not _wrote_recently(request):
+        # Measuring lag is a blocking round-trip to the replica
+        replica = await run_in_threadpool(_choose_replica)
+    if replica:
+        db = _AsyncReadSessionLocal(replica_bind=replica.get_async_engine().sync_engine)
+    else:
+        db = _AsyncSessionLocal()
+    async with db:
+        yield db
@@ -0,0 +1,85 @@
+"""
+Report foreign keys that no index covers
+
+A foreign key column that is filtered or joined on (relationship loads,
+ownership filters, ON DELETE lookups) needs an index whose leading columns
+are the key; otherwise each lookup scans the table. Run as
+
+    python -m backend.index_check
+
+which exits non-zero when any are found. On Postgres the report includes
+each table's sequential scan count, which shows the keys actually used in
+filters.
+"""
+
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+SEQ_SCAN_SQL = text("SELECT relname, seq_scan, seq_tup_read FROM pg_stat_user_tables")
+
+
+class UnindexedForeignKey:
+    def __init__(self, table: str, columns: Sequence[str], referred_table: str):
+        self.table = table
+        self.columns = list(columns)
+        self.referred_table = referred_table
+        self.seq_scan: Optional[int] = None
+        self.seq_tup_read: Optional[int] = None
+
+    def __str__(self) -> str:
+        line = f"{self.table}({', '.join(self.columns)}) -> {self.referred_table}"
+        if self.seq_scan is not None:
+            line += f"  [seq_scan={self.seq_scan}, seq_tup_read={self.seq_tup_read}]"
+        return line
+
+
+def _is_prefix(columns: List[str], index_columns: Sequence[Optional[str]]) -> bool:
+    return list(index_columns[: len(columns)]) == columns
+
+
+def find_unindexed_foreign_keys(engine: Engine) -> List[UnindexedForeignKey]:
+    """Foreign keys in the live schema that are not a leading index prefix"""
+    inspector = inspect(engine)
+    missing = []
+    for table in inspector.get_table_names():
+        covering = [index["column_names"] for index in inspector.get_indexes(table)]
+        covering.append(inspector.get_pk_constraint(table)["constrained_columns"])
+        covering.extend(
+            constraint["column_names"]
+            for constraint in inspector.get_unique_constraints(table)
+        )
+        for fk in inspector.get_foreign_keys(table):
+            columns = fk["constrained_columns"]
+            if not any(_is_prefix(columns, index_columns) for index_columns in covering):
+                missing.append(UnindexedForeignKey(table, columns, fk["referred_table"]))
+
+    if missing and engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            scans: Dict[str, tuple] = {
+                relname: (seq_scan, seq_tup_read)
+                for relname, seq_scan, seq_tup_read in conn.execute(SEQ_SCAN_SQL)
+            }
+        for fk in missing:
+            fk.seq_scan, fk.seq_tup_read = scans.get(fk.table, (None, None))
+        missing.sort(key=lambda fk: fk.seq_tup_read or 0, reverse=True)
+    return missing
+
+
+def main() -> int:
+    from .database import engine
+
+    missing = find_unindexed_foreign_keys(engine)
+    if not missing:
+        print("All foreign keys are covered by an index")
+        return 0
+    print(f"{len(missing)} foreign keys without a covering index:")
+    for fk in missing:
+        print(f"  {fk}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
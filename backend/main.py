@@ -5,6 +5,7 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 
+import httpx
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, Request
 from fastapi.encoders import jsonable_encoder
@@ -17,7 +18,18 @@ from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 
 from . import crud, models, schemas
-from .database import SessionLocal, engine, get_db
+from .database import (
+    READ_PRIMARY_HEADER,
+    SessionLocal,
+    engine,
+    get_db,
+    pool_stats,
+    read_primary_until,
+    replicas,
+)
+from .index_check import find_unindexed_foreign_keys
+from .pagination import NEXT_CURSOR_HEADER, InvalidCursor
+from .query_stats import end_request, start_request
 from .routers import (
     ai,
     auth,
@@ -28,9 +40,11 @@ from .routers import (
     project_sheets,
     proposals,
     resumes,
+    search,
     templates,
     user_profiles,
 )
+from .services.embeddings import embedding_service
 from .services.template_service import template_service
 
 load_dotenv()
@@ -92,11 +106,22 @@ async def lifespan(app: FastAPI):
 
     # Initialize default data
     await _initialize_default_data()
+
+    # Embed the experience library off the request path
+    embedding_service.start_background_refresh(SessionLocal)
+
+    # Shared connection pool for proxying media from remote storage
+    app.state.media_http_client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+
+    if settings.debug:
+        for fk in find_unindexed_foreign_keys(engine):
+            logger.warning(f"Foreign key without a covering index: {fk}")
     logger.info("Application startup complete")
 
     yield
 
     # Shutdown
+    await app.state.media_http_client.aclose()
     logger.info("Application shutdown")
 
 
@@ -122,6 +147,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER,
+        READ_PRIMARY_HEADER,
+        "X-DB-Queries",
+        "Server-Timing",
+    ],
 )
 
 
@@ -140,6 +171,34 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+# Keep a client's reads on the primary for a moment after its own writes,
+# so read replicas never hide them. The client echoes the header back on
+# its next requests (frontend lib/api.js).
+@app.middleware("http")
+async def track_writes(request: Request, call_next):
+    response = await call_next(request)
+    if replicas and request.method not in ("GET", "HEAD", "OPTIONS"):
+        response.headers[READ_PRIMARY_HEADER] = read_primary_until()
+    return response
+
+
+# Count the statements each request issues; reported in debug so N+1
+# patterns show up in the browser's network panel
+@app.middleware("http")
+async def count_queries(request: Request, call_next):
+    stats, token = start_request(request.url.path)
+    try:
+        response = await call_next(request)
+    finally:
+        end_request(token)
+    if settings.debug:
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'
+        )
+    return response
+
+
 # Configure rotating file logging to backend/logs/app.log
 def _setup_logging():
     try:
@@ -198,6 +257,7 @@ app.include_router(user_profiles.router)
 app.include_router(projects.router)
 app.include_router(project_sheets.router)
 app.include_router(media.router)
+app.include_router(search.router)
 
 
 async def _initialize_default_data():
@@ -264,6 +324,14 @@ def health_check(db: Session = Depends(get_db)):
     }
 
 
+@app.get("/api/metrics/db-pool")
+def get_db_pool_metrics(
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Connection pool usage and checkout wait times for this worker process"""
+    return pool_stats()
+
+
 @app.get("/api/templates/available")
 def list_available_templates():
     """List all available template files"""
@@ -331,6 +399,12 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     return JSONResponse(status_code=422, content={"detail": safe_errors})
 
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    """A malformed or foreign pagination cursor is a client error"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors"""
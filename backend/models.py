@@ -2,9 +2,11 @@ from sqlalchemy import (
     JSON,
     Boolean,
     Column,
+    Computed,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     LargeBinary,
     Numeric,
@@ -12,8 +14,17 @@ from sqlalchemy import (
     Text,
     func,
 )
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
+
+
+def trigram_index(name, column_name):
+    """GIN trigram index serving ILIKE '%q%' and similarity typeahead lookups"""
+    return Index(
+        name, column_name, postgresql_using="gin", postgresql_ops={column_name: "gin_trgm_ops"}
+    )
+
 
 Base = declarative_base()
 
@@ -126,18 +137,24 @@ class ProjectProposal(Base):
     created_by = relationship("User", back_populates="created_proposals")
     notes = relationship("ProposalNote", back_populates="proposal")
 
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
 
     resumes = relationship("Resume", back_populates="project_proposal")
 
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_project_proposals_created", created_at.desc(), id.desc()),
+    )
+
 
 class Template(Base):
     __tablename__ = "templates"
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
-    content = Column(Text, nullable=False)
+    # Deferred so list queries don't load the template HTML
+    content = deferred(Column(Text, nullable=False))
     is_default = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -145,11 +162,17 @@ class Template(Base):
 
     resumes = relationship("Resume", back_populates="template")
 
+    __table_args__ = (
+        # Only the default template is ever looked up by this flag
+        Index("ix_templates_is_default", is_default, postgresql_where=is_default),
+    )
+
 
 class Media(Base):
     __tablename__ = "media"
     id = Column(Integer, primary_key=True)
-    cloudinary_public_id = Column(String(255), nullable=False, unique=True)
+    # Not unique: rows with identical content share one remote asset
+    cloudinary_public_id = Column(String(255), nullable=False, index=True)
     cloudinary_url = Column(Text, nullable=False)
     preview_url = Column(Text)  # Thumbnail for images, first page for PDFs
     resource_type = Column(String(20), nullable=False)  # 'image' or 'pdf'
@@ -159,10 +182,51 @@ class Media(Base):
     height = Column(Integer)
     pages = Column(Integer)  # For PDFs
     bytes = Column(Integer)
+    content_sha256 = Column(String(64), index=True)  # For deduplicating uploads
     uploaded_by = Column(Integer, ForeignKey("users.id"))
     uploaded_at = Column(DateTime, default=func.now())
     file_metadata = Column(JSON, default=dict)
 
+    __table_args__ = (
+        # Keyset pagination of a user's library, newest first
+        Index("ix_media_library", "uploaded_by", "media_type", uploaded_at.desc(), id.desc()),
+        Index("ix_media_library_all", "uploaded_by", uploaded_at.desc(), id.desc()),
+    )
+
+
+class PdfExtraction(Base):
+    """Extracted PDF text and metadata, keyed by SHA-256 of the PDF bytes"""
+
+    __tablename__ = "pdf_extractions"
+    id = Column(Integer, primary_key=True)
+    content_sha256 = Column(String(64), nullable=False, unique=True)
+    text = Column(Text)
+    file_metadata = Column(JSON, default=dict)
+    page_count = Column(Integer)
+    word_count = Column(Integer)
+    summary = Column(Text)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class Embedding(Base):
+    """Embedding vector of an entity's text (float32 bytes, L2-normalized)"""
+
+    __tablename__ = "embeddings"
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(32), nullable=False)  # 'experience', 'proposal'
+    entity_id = Column(Integer, nullable=False)
+    model = Column(String(200), nullable=False)  # Embedder that produced the vector
+    dimensions = Column(Integer, nullable=False)
+    content_sha256 = Column(String(64), nullable=False)  # Hash of the embedded text
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_embeddings_entity_model", "entity_type", "model", "entity_id", unique=True),
+    )
+
 
 class ProjectMedia(Base):
     __tablename__ = "project_media"
@@ -236,8 +300,8 @@ class UserProfile(Base):
     education = Column(JSON, nullable=True, default=list)
 
     # Legacy/System fields
-    main_image_id = Column(Integer, ForeignKey("media.id"), nullable=True)
-    created_at = Column(DateTime, default=func.now())
+    main_image_id = Column(Integer, ForeignKey("media.id"), nullable=True, index=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
 
@@ -246,12 +310,26 @@ class UserProfile(Base):
     main_image = relationship("Media")
     resumes = relationship("Resume", back_populates="user_profile")
 
+    __table_args__ = (
+        trigram_index("ix_user_profiles_full_name_trgm", "full_name"),
+        trigram_index("ix_user_profiles_first_name_trgm", "first_name"),
+        trigram_index("ix_user_profiles_last_name_trgm", "last_name"),
+        trigram_index("ix_user_profiles_current_title_trgm", "current_title"),
+        trigram_index("ix_user_profiles_department_trgm", "department"),
+        # Keyset pagination, newest first
+        Index("ix_user_profiles_user_created", "user_id", created_at.desc(), id.desc()),
+        Index("ix_user_profiles_created", created_at.desc(), id.desc()),
+    )
+
 
 class ProfileExperience(Base):
     __tablename__ = "profile_experiences"
     id = Column(Integer, primary_key=True)
     user_profile_id = Column(
-        Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("user_profiles.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     company_name = Column(String(200), nullable=True)
@@ -276,7 +354,10 @@ class ProfileSkill(Base):
     __tablename__ = "profile_skills"
     id = Column(Integer, primary_key=True)
     user_profile_id = Column(
-        Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("user_profiles.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     skill_name = Column(String(200), nullable=False)
@@ -296,7 +377,10 @@ class ProfileCertification(Base):
     __tablename__ = "profile_certifications"
     id = Column(Integer, primary_key=True)
     user_profile_id = Column(
-        Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("user_profiles.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     name = Column(String(200), nullable=False)
@@ -318,7 +402,10 @@ class ProfileEducation(Base):
     __tablename__ = "profile_education"
     id = Column(Integer, primary_key=True)
     user_profile_id = Column(
-        Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False
+        Integer,
+        ForeignKey("user_profiles.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     institution = Column(String(200), nullable=False)
@@ -350,7 +437,7 @@ class Project(Base):
     
     date = Column(Date, nullable=True)
     contract_value = Column(Numeric(12, 2), nullable=True)
-    main_image_id = Column(Integer, ForeignKey("media.id"), nullable=True)
+    main_image_id = Column(Integer, ForeignKey("media.id"), nullable=True, index=True)
     
     # Project sheet fields
     location = Column(String(255), nullable=True)
@@ -358,7 +445,7 @@ class Project(Base):
     contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True)
     project_details = Column(JSON, nullable=True)  # Additional details for project sheets
 
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
     
@@ -371,6 +458,13 @@ class Project(Base):
     # Project sheets relationship
     project_sheets = relationship("ProjectSheet", back_populates="project", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        trigram_index("ix_projects_name_trgm", "name"),
+        trigram_index("ix_projects_sheet_description_trgm", "project_sheet_description"),
+        # Keyset pagination, newest first
+        Index("ix_projects_created", created_at.desc(), id.desc()),
+    )
+
 
 class ProjectSheet(Base):
     __tablename__ = "project_sheets"
@@ -378,8 +472,8 @@ class ProjectSheet(Base):
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     generated_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    generated_content = Column(Text, nullable=True)  # Store rendered HTML like resumes
-    template_data = Column(JSON, nullable=True)  # Store generation context
+    generated_content = deferred(Column(Text, nullable=True))  # Store rendered HTML like resumes
+    template_data = deferred(Column(JSON, nullable=True))  # Store generation context
     status = Column(String(50), nullable=False, default="generated")  # generated, archived, etc.
     
     created_at = Column(DateTime, default=func.now())
@@ -389,16 +483,22 @@ class ProjectSheet(Base):
     project = relationship("Project", back_populates="project_sheets")
     generated_by_user = relationship("User")
 
+    __table_args__ = (
+        # Keyset pagination of a user's sheets, newest first
+        Index("ix_project_sheets_generated_by_created", "generated_by", created_at.desc(), id.desc()),
+        Index("idx_project_sheets_project", "project_id"),
+    )
+
 
 class Resume(Base):
     __tablename__ = "resumes"
     id = Column(Integer, primary_key=True)
     alias = Column(String, nullable=True)  # User-friendly name for the resume
     status = Column(String, default="draft", nullable=False)
-    generated_content = Column(Text)
+    generated_content = deferred(Column(Text))
 
     project_proposal_id = Column(
-        Integer, ForeignKey("project_proposals.id"), nullable=True
+        Integer, ForeignKey("project_proposals.id"), nullable=True, index=True
     )
     project_proposal = relationship("ProjectProposal", back_populates="resumes")
 
@@ -416,10 +516,15 @@ class Resume(Base):
         order_by="ResumeExperienceDetail.display_order",
     )
 
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_resumes_created", created_at.desc(), id.desc()),
+    )
+
 
 class Contact(Base):
     __tablename__ = "contacts"
@@ -429,13 +534,18 @@ class Contact(Base):
     phone = Column(String)
     last_contact_date = Column(Date)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=True)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
     client = relationship("Client", back_populates="contacts", foreign_keys=[client_id])
     experiences = relationship("Experience", back_populates="contact")
     contact_projects = relationship("Project", back_populates="contact")
 
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_contacts_created", created_at.desc(), id.desc()),
+    )
+
 
 class Client(Base):
     __tablename__ = "clients"
@@ -448,7 +558,7 @@ class Client(Base):
     last_project_date = Column(Date)
     main_contact_id = Column(Integer, ForeignKey("contacts.id"))
     main_contact = relationship("Contact", foreign_keys=[main_contact_id])
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
     contacts = relationship(
@@ -457,6 +567,12 @@ class Client(Base):
     experiences = relationship("Experience", back_populates="client")
     projects = relationship("Project", back_populates="client")
 
+    __table_args__ = (
+        trigram_index("ix_clients_client_name_trgm", "client_name"),
+        # Keyset pagination, newest first
+        Index("ix_clients_created", created_at.desc(), id.desc()),
+    )
+
 
 class Experience(Base):
     __tablename__ = "experiences"
@@ -468,14 +584,43 @@ class Experience(Base):
     date_completed = Column(Date)
     location = Column(String)
     tags = Column(String)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     contact_id = Column(Integer, ForeignKey("contacts.id"))
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)
+    # Weighted full-text document maintained by Postgres: name (A), tags (B),
+    # description (C). Deferred since only search queries use it.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(project_name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(tags, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(project_description, '')), 'C')",
+                persisted=True,
+            ),
+        )
+    )
+    # Trimmed, non-empty entries of the comma-separated tags, maintained by
+    # Postgres for exact tag filters and facet counts
+    tag_list = Column(
+        ARRAY(Text),
+        Computed(
+            "coalesce(array_remove(regexp_split_to_array(btrim(tags), '\\s*,\\s*'), ''), '{}')",
+            persisted=True,
+        ),
+    )
     client = relationship("Client", back_populates="experiences")
     contact = relationship("Contact", back_populates="experiences")
 
+    __table_args__ = (
+        Index("ix_experiences_search_vector", search_vector, postgresql_using="gin"),
+        Index("ix_experiences_tag_list", tag_list, postgresql_using="gin"),
+        # Keyset pagination, newest first
+        Index("ix_experiences_created", created_at.desc(), id.desc()),
+    )
+
     # Relationship to ResumeExperienceDetail
     resume_experience_details = relationship(
         "ResumeExperienceDetail", back_populates="experience"
@@ -485,7 +630,10 @@ class Experience(Base):
 class ResumeExperienceDetail(Base):
     __tablename__ = "resume_experience_details"
     resume_id = Column(Integer, ForeignKey("resumes.id"), primary_key=True)
-    experience_id = Column(Integer, ForeignKey("experiences.id"), primary_key=True)
+    # Second column of the primary key, so it needs its own index
+    experience_id = Column(
+        Integer, ForeignKey("experiences.id"), primary_key=True, index=True
+    )
 
     # Original description from the experience
     overridden_project_description = Column(Text, nullable=True)
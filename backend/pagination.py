@@ -0,0 +1,141 @@
+"""
+Keyset (cursor) pagination helpers
+
+Pages are selected with a row comparison on the sort key, e.g.
+(uploaded_at, id) < (:last_uploaded_at, :last_id), so every page is an index
+range scan regardless of how deep the client has paged. Cursors are opaque,
+URL-safe strings encoding the sort key of the last row returned.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor with `size` key values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("unexpected cursor shape")
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def _bind_value(column, value: Any):
+    """Bind a decoded cursor value as a parameter of its column's type
+
+    Date and datetime values are parsed from ISO strings by the column type,
+    and values of the wrong type are rejected instead of being compared
+    loosely in SQL.
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+
+    try:
+        if python_type is datetime and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif python_type is date and isinstance(value, str):
+            value = date.fromisoformat(value)
+    except ValueError as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+    if python_type is not None and value is not None:
+        # bool is an int subclass; a cursor never holds one for a numeric key
+        expected = (int, float) if python_type is float else python_type
+        if not isinstance(value, expected) or (isinstance(value, bool) and python_type is not bool):
+            raise InvalidCursor("Invalid pagination cursor")
+    return literal(value, type_=column.type)
+
+
+def keyset_paginate(
+    query: Query,
+    order_columns: Sequence,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = True,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page of a query ordered by a unique sort key.
+
+    Args:
+        query: Filtered query; it must not be ordered or limited yet
+        order_columns: Columns forming a unique sort key, most significant
+            first (end with the primary key). Their values must be non-null
+            and readable from result rows by column key.
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        descending: Sort direction for every key column
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        InvalidCursor: if the cursor cannot be decoded or its values do not
+            match the key column types
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(order_columns))
+        key = tuple_(*order_columns)
+        bound = tuple_(*(_bind_value(column, value) for column, value in zip(order_columns, values)))
+        query = query.filter(key < bound if descending else key > bound)
+
+    query = query.order_by(
+        *(column.desc() if descending else column.asc() for column in order_columns)
+    )
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_columns])
+    return rows, next_cursor
+
+
+def page_response(response: Response, page: Tuple[list, Optional[str]]) -> list:
+    """Return a page's rows, passing its next cursor in the X-Next-Cursor header"""
+    rows, next_cursor = page
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
@@ -0,0 +1,127 @@
+"""
+Per-request SQL statement counts and timings, and the slow-query log
+
+Cursor execution hooks on every Engine (sync, async and replicas) add each
+statement to the stats of the request being served, held in a contextvar.
+"""
+
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements slower than this are logged with their normalized SQL
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+
+logger = logging.getLogger("app.sql")
+
+
+class QueryStats:
+    """Statements issued while serving one request"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.count = 0
+        self.total_seconds = 0.0
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_request(path: Optional[str] = None) -> Tuple[QueryStats, Token]:
+    stats = QueryStats(path)
+    return stats, _current.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+\b|%s")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals, bind markers and expanded IN lists
+
+    Statements that differ only in their values normalize to the same text,
+    so slow-query log lines group by query shape.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NAMED_PARAM.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PARAM_LIST.sub("...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_times")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_seconds += elapsed
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            elapsed * 1000,
+            stats.path if stats and stats.path else "-",
+            normalize_sql(statement),
+        )
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[List[str]]:
+    """Fail when the block issues more than max_queries statements
+
+    For tests, e.g. to pin an endpoint against N+1 regressions:
+
+        with assert_max_queries(3):
+            client.get("/api/resumes/1")
+
+    Counts statements on every engine in the process, including ones run by
+    the app's worker threads.
+    """
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+    if len(statements) > max_queries:
+        raise AssertionError(
+            f"{len(statements)} queries issued, expected at most {max_queries}:\n"
+            + "\n".join(normalize_sql(statement) for statement in statements)
+        )
@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_response
 from ..routers.auth import get_current_active_user
 
 router = APIRouter(
@@ -15,13 +16,18 @@ router = APIRouter(
 
 
 @router.get("/clients", response_model=List[schemas.Client])
-def get_clients(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    clients = crud.get_clients(db, skip=skip, limit=limit)
-    return clients
+def get_clients(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    """Clients, newest first; the next page's cursor is in X-Next-Cursor"""
+    return page_response(response, crud.get_clients(db, cursor=cursor, limit=limit))
 
 
 @router.get("/clients/{client_id}", response_model=schemas.Client)
-def get_client(client_id: int, db: Session = Depends(get_db)):
+def get_client(client_id: int, db: Session = Depends(get_read_db)):
     client = crud.get_client(db, client_id=client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
@@ -65,6 +71,11 @@ def delete_client(client_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/contacts", response_model=List[schemas.Contact])
-def get_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    contacts = crud.get_contacts(db, skip=skip, limit=limit)
-    return contacts
+def get_contacts(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    """Contacts, newest first; the next page's cursor is in X-Next-Cursor"""
+    return page_response(response, crud.get_contacts(db, cursor=cursor, limit=limit))
@@ -1,10 +1,11 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_response
 from ..routers.auth import get_current_active_user
 
 router = APIRouter(
@@ -16,14 +17,55 @@ router = APIRouter(
 
 @router.get("/experiences", response_model=List[schemas.Experience])
 def get_experiences(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     q: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    tags: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_read_db),
 ):
+    """
+    Experiences, newest first; the next page's cursor is in X-Next-Cursor.
+
+    Repeated `tags` params require all of those tags. With q, the best
+    full-text matches instead.
+    """
     if q:
-        return crud.search_experiences(db, q=q, skip=skip, limit=limit)
-    return crud.get_experiences(db, skip=skip, limit=limit)
+        return crud.search_experiences(db, q=q, limit=limit, tags=tags)
+    return page_response(
+        response, crud.get_experiences(db, cursor=cursor, limit=limit, tags=tags)
+    )
+
+
+@router.get("/experiences/tags", response_model=List[schemas.TagCount])
+def get_experience_tags(
+    tags: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """Tag facet counts, most used first, within an optional tag filter"""
+    return [
+        {"tag": tag, "count": count}
+        for tag, count in crud.get_experience_tag_counts(db, tags=tags, limit=limit)
+    ]
+
+
+@router.get("/experiences/search", response_model=List[schemas.ExperienceSearchResult])
+def search_experiences(
+    q: str = Query(..., min_length=1),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """Ranked full-text search with highlighted description snippets"""
+    results = []
+    for experience, rank, snippet in crud.search_experiences_ranked(
+        db, q=q, skip=skip, limit=limit
+    ):
+        experience.rank = rank
+        experience.snippet = snippet
+        results.append(experience)
+    return results
 
 
 @router.post("/experiences", response_model=schemas.Experience)
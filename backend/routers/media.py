@@ -1,18 +1,61 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Query, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from starlette.background import BackgroundTask
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
 import json
+import logging
+import mimetypes
+import os
 from datetime import datetime
 
+import httpx
+
+from ..services.cache import TTLCache
+from ..services.media_ingest import IngestedUpload, UploadRejected, ingest_upload
+from ..services.media_variants import media_variant_service
 from ..services.storage_service import storage_service
-from ..database import get_db
+from ..database import get_async_db, get_async_read_db
+from ..pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    InvalidCursor,
+    keyset_paginate,
+)
 from .auth import get_current_user
 from .. import models
 
 router = APIRouter(prefix="/api/media", tags=["media"])
 
+logger = logging.getLogger("app")
+
 ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+ALLOWED_IMAGE_FORMATS = {"png", "jpeg", "gif", "webp"}  # Sniffed from file header
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_BATCH_FILES = int(os.getenv("MEDIA_MAX_BATCH_FILES", "20"))
+
+# /raw serving: "redirect" (default) to the storage URL, or "proxy" the bytes
+MEDIA_RAW_MODE = os.getenv("MEDIA_RAW_MODE", "redirect").lower()
+MEDIA_RAW_MAX_AGE = int(os.getenv("MEDIA_RAW_MAX_AGE", "86400"))
+
+# media id -> storage URL/ETag; entries expire so deletes made by other
+# workers are picked up, and local deletes invalidate immediately
+media_url_cache = TTLCache(
+    max_size=int(os.getenv("MEDIA_URL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("MEDIA_URL_CACHE_TTL", "300")),
+)
+
+# (folder, cursor, page size) -> remote Cloudinary listing page. Only the
+# remote snapshot is cached; the diff against the database is always fresh.
+cloudinary_browse_cache = TTLCache(
+    max_size=256, ttl=float(os.getenv("CLOUDINARY_BROWSE_CACHE_TTL", "60"))
+)
+CLOUDINARY_BROWSE_MAX_PAGES = 5  # Remote pages read per request while skipping imported ones
 
 
 def validate_file_extension(filename: str, allowed_extensions: set) -> bool:
@@ -22,6 +65,100 @@ def validate_file_extension(filename: str, allowed_extensions: set) -> bool:
     return extension in allowed_extensions
 
 
+def find_media_by_content(
+    db: Session, content_sha256: str, user_id: int, media_type: Optional[str]
+) -> Optional[models.Media]:
+    """Find stored media with identical bytes, preferring the user's own library"""
+    candidates = db.query(models.Media).filter(
+        models.Media.content_sha256 == content_sha256
+    ).all()
+    if not candidates:
+        return None
+    for media in candidates:
+        if media.uploaded_by == user_id and media.media_type == media_type:
+            return media
+    return candidates[0]
+
+
+def associate_media(
+    db: Session,
+    entity_type: Optional[str],
+    entity_id: Optional[int],
+    media_id: int,
+    attachment_type: Optional[str],
+) -> None:
+    """Link media to a project, profile or resume (idempotent per association key)"""
+    if not (entity_type and entity_id):
+        return
+    if entity_type == "project":
+        db.merge(models.ProjectMedia(
+            project_id=entity_id,
+            media_id=media_id,
+            media_type=attachment_type  # Use attachment_type for associations
+        ))
+    elif entity_type == "profile":
+        db.merge(models.ProfileMedia(
+            profile_id=entity_id,
+            media_id=media_id,
+            media_type=attachment_type  # Use attachment_type for associations
+        ))
+    elif entity_type == "resume":
+        db.merge(models.ResumeMedia(
+            resume_id=entity_id,
+            media_id=media_id,
+            media_type=attachment_type  # Use attachment_type for associations
+        ))
+
+
+def stored_asset(media: models.Media) -> dict:
+    """Describe an already stored asset in the shape returned by uploads"""
+    return {
+        "storage_type": (media.file_metadata or {}).get("storage_type"),
+        "storage_id": media.cloudinary_public_id,
+        "url": media.cloudinary_url,
+        "thumbnail_url": media.preview_url,
+        "width": media.width,
+        "height": media.height,
+        "format": media.format,
+        "bytes": media.bytes,
+        "variants": (media.file_metadata or {}).get("variants") or {},
+    }
+
+
+def build_media(
+    result: dict, ingested, user_id: int, media_type: Optional[str]
+) -> models.Media:
+    """Create (but do not add) a Media row for an uploaded or reused asset"""
+    variants = result.get("variants") or {}
+    # Cloudinary thumbnails are generated asynchronously; the local thumbnail
+    # variant is ready immediately
+    preview_url = result.get("thumbnail_url") or variants.get("thumbnail", {}).get("url")
+    # The frontend is served from another origin; it falls back to the
+    # original URL when there is no preview
+    if preview_url and not preview_url.startswith("http"):
+        preview_url = None
+    return models.Media(
+        cloudinary_public_id=result.get("storage_id"),
+        cloudinary_url=result["url"],
+        preview_url=preview_url,
+        resource_type="image",
+        format=result.get("format"),
+        width=result.get("width"),
+        height=result.get("height"),
+        pages=result.get("pages"),
+        bytes=result.get("bytes"),
+        content_sha256=ingested.sha256,
+        uploaded_by=user_id,
+        media_type=media_type,  # 'project', 'profile', or 'general'
+        file_metadata={
+            "original_filename": ingested.filename,
+            "uploaded_at": datetime.utcnow().isoformat(),
+            "storage_type": result.get("storage_type"),
+            "variants": variants,
+        }
+    )
+
+
 @router.post("/upload")
 async def upload_media(
     file: UploadFile = File(...),
@@ -29,118 +166,346 @@ async def upload_media(
     entity_id: Optional[int] = Form(None),
     media_type: Optional[str] = Form("general"),  # 'project', 'profile', 'general'
     attachment_type: Optional[str] = Form("attachment"),  # For association tables
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """Upload image to Cloudinary with categorization"""
-    # Validate file size
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large. Maximum size: {MAX_FILE_SIZE/1024/1024}MB",
-        )
-
-    # Reset file position
-    file.file.seek(0)
-
     # Validate image file type
     if not validate_file_extension(file.filename, ALLOWED_IMAGE_EXTENSIONS):
         raise HTTPException(status_code=400, detail="Only image files are allowed (PNG, JPG, JPEG, GIF, WEBP)")
 
+    # Stream the file in chunks, enforcing the size limit and sniffing the
+    # header as it is read
     try:
-        # Upload image to Cloudinary
-        result = storage_service.upload_image(
-            file.file, folder=f"images/{current_user.id}"
+        ingested = await ingest_upload(
+            file, max_size=MAX_FILE_SIZE, allowed_formats=ALLOWED_IMAGE_FORMATS
         )
-        
-        # Check for duplicates within the same media_type
-        existing_media = db.query(models.Media).filter(
-            models.Media.cloudinary_public_id == result.get("storage_id"),
-            models.Media.media_type == media_type,
-            models.Media.uploaded_by == current_user.id
-        ).first()
-        
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    try:
+        # Deduplicate by content before any remote upload
+        existing_media = await db.run_sync(
+            find_media_by_content, ingested.sha256, current_user.id, media_type
+        )
+
+        if (
+            existing_media
+            and existing_media.uploaded_by == current_user.id
+            and existing_media.media_type == media_type
+        ):
+            # Same bytes already in this library: reuse the row, only link it
+            await db.run_sync(
+                associate_media, entity_type, entity_id, existing_media.id, attachment_type
+            )
+            await db.commit()
+            return {
+                "id": existing_media.id,
+                "url": existing_media.cloudinary_url,
+                "preview_url": existing_media.preview_url,
+                "resource_type": existing_media.resource_type,
+                "storage_id": existing_media.cloudinary_public_id,
+                "duplicate": True,
+            }
+
         if existing_media:
-            # Delete the uploaded image from Cloudinary since it's a duplicate
-            storage_service.delete_image(result.get("storage_id"))
-            raise HTTPException(
-                status_code=409, 
-                detail=f"This image already exists in your {media_type} media library"
+            # Same bytes already stored remotely: reuse the asset, no upload
+            result = stored_asset(existing_media)
+        else:
+            # Upload image to the configured storage backend
+            result = await storage_service.upload_image_async(
+                ingested.file,
+                folder=f"images/{current_user.id}",
+                content_sha256=ingested.sha256,
+                file_format=ingested.format,
             )
+            result["variants"] = await media_variant_service.generate(ingested.file, result)
 
         # Save to database using ORM
-        db_media = models.Media(
-            cloudinary_public_id=result.get("storage_id"),
-            cloudinary_url=result["url"],
-            preview_url=result.get("thumbnail_url"),
-            resource_type="image",
-            format=result.get("format"),
-            width=result.get("width"),
-            height=result.get("height"),
-            pages=result.get("pages"),
-            bytes=result.get("bytes"),
-            uploaded_by=current_user.id,
-            media_type=media_type,  # 'project', 'profile', or 'general'
-            file_metadata={
-                "original_filename": file.filename,
-                "uploaded_at": datetime.utcnow().isoformat(),
-                "storage_type": result.get("storage_type"),
-            }
-        )
+        db_media = build_media(result, ingested, current_user.id, media_type)
         db.add(db_media)
-        db.flush()  # Get the ID without committing
+        await db.flush()  # Get the ID without committing
         media_id = db_media.id
 
         # Associate with entity if provided using ORM
-        if entity_type and entity_id:
-            if entity_type == "project":
-                db_project_media = models.ProjectMedia(
-                    project_id=entity_id,
-                    media_id=media_id,
-                    media_type=attachment_type  # Use attachment_type for associations
-                )
-                db.add(db_project_media)
-            elif entity_type == "profile":
-                db_profile_media = models.ProfileMedia(
-                    profile_id=entity_id,
-                    media_id=media_id,
-                    media_type=attachment_type  # Use attachment_type for associations
-                )
-                db.add(db_profile_media)
-            elif entity_type == "resume":
-                db_resume_media = models.ResumeMedia(
-                    resume_id=entity_id,
-                    media_id=media_id,
-                    media_type=attachment_type  # Use attachment_type for associations
-                )
-                db.add(db_resume_media)
+        await db.run_sync(
+            associate_media, entity_type, entity_id, media_id, attachment_type
+        )
 
-        db.commit()
+        await db.commit()
 
         return {
             "id": media_id,
             "url": result["url"],
-            "preview_url": result.get("thumbnail_url"),
+            "preview_url": db_media.preview_url,
             "resource_type": "image",
             "storage_id": result.get("storage_id"),
         }
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        ingested.close()
+
+
+def _file_error(filename: Optional[str], detail: str) -> dict:
+    return {"filename": filename, "status": "error", "detail": detail}
+
+
+async def _ingest_batch(
+    files: List[UploadFile], results: List[dict], ingested_files: Dict[int, IngestedUpload]
+) -> None:
+    """Stream and validate every file into ingested_files; nothing is uploaded yet"""
+    for index, file in enumerate(files):
+        if not validate_file_extension(file.filename or "", ALLOWED_IMAGE_EXTENSIONS):
+            results[index] = _file_error(
+                file.filename, "Only image files are allowed (PNG, JPG, JPEG, GIF, WEBP)"
+            )
+            continue
+        try:
+            ingested_files[index] = await ingest_upload(
+                file, max_size=MAX_FILE_SIZE, allowed_formats=ALLOWED_IMAGE_FORMATS
+            )
+        except UploadRejected as e:
+            results[index] = _file_error(file.filename, e.detail)
+
+
+async def _find_batch_content(
+    db: AsyncSession,
+    ingested_files: Dict[int, IngestedUpload],
+    user_id: int,
+    media_type: Optional[str],
+) -> Tuple[Dict[str, models.Media], Dict[str, int]]:
+    """
+    Resolve content hashes against the library.
+
+    Identical files within the batch share one lookup. Returns the stored
+    media per hash, and for new content the index of the one file to upload.
+    """
+    existing_by_sha = {}
+    pending_by_sha = {}
+    for index, ingested in ingested_files.items():
+        if ingested.sha256 in existing_by_sha or ingested.sha256 in pending_by_sha:
+            continue
+        existing = await db.run_sync(find_media_by_content, ingested.sha256, user_id, media_type)
+        if existing:
+            existing_by_sha[ingested.sha256] = existing
+        else:
+            pending_by_sha[ingested.sha256] = index
+    return existing_by_sha, pending_by_sha
+
+
+async def _store_new_content(
+    ingested_files: Dict[int, IngestedUpload], pending_by_sha: Dict[str, int], user_id: int
+) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """Upload each new hash once, concurrently; returns results and errors by hash"""
+
+    async def upload_one(ingested: IngestedUpload) -> dict:
+        result = await storage_service.upload_image_async(
+            ingested.file,
+            folder=f"images/{user_id}",
+            content_sha256=ingested.sha256,
+            file_format=ingested.format,
+        )
+        result["variants"] = await media_variant_service.generate(ingested.file, result)
+        return result
+
+    outcomes = await asyncio.gather(
+        *(upload_one(ingested_files[index]) for index in pending_by_sha.values()),
+        return_exceptions=True,
+    )
+    uploaded_by_sha = {}
+    upload_errors = {}
+    for sha, outcome in zip(pending_by_sha, outcomes):
+        if isinstance(outcome, BaseException):
+            upload_errors[sha] = str(outcome)
+        else:
+            uploaded_by_sha[sha] = outcome
+    return uploaded_by_sha, upload_errors
+
+
+def _stage_batch_media(
+    db: AsyncSession,
+    ingested_files: Dict[int, IngestedUpload],
+    existing_by_sha: Dict[str, models.Media],
+    uploaded_by_sha: Dict[str, dict],
+    upload_errors: Dict[str, str],
+    results: List[dict],
+    user_id: int,
+    media_type: Optional[str],
+) -> List[Tuple[int, models.Media, bool]]:
+    """
+    Add a Media row per distinct new content; returns (index, Media, duplicate)
+
+    Rows created earlier in the batch are checked first, so identical files
+    never add two rows for one hash, even when the library copy belongs to
+    another user or media type.
+    """
+    created = {}  # sha -> Media created in this batch
+    linked = []
+    for index, ingested in ingested_files.items():
+        sha = ingested.sha256
+        if sha in upload_errors:
+            results[index] = _file_error(ingested.filename, upload_errors[sha])
+            continue
+
+        if sha in created:
+            linked.append((index, created[sha], True))
+            continue
+
+        existing = existing_by_sha.get(sha)
+        if existing and existing.uploaded_by == user_id and existing.media_type == media_type:
+            linked.append((index, existing, True))
+            continue
+
+        result = uploaded_by_sha.get(sha) or stored_asset(existing)
+        db_media = build_media(result, ingested, user_id, media_type)
+        db.add(db_media)
+        created[sha] = db_media
+        linked.append((index, db_media, False))
+    return linked
+
+
+async def _associate_batch(
+    db: AsyncSession,
+    linked: List[Tuple[int, models.Media, bool]],
+    ingested_files: Dict[int, IngestedUpload],
+    results: List[dict],
+    entity_type: Optional[str],
+    entity_id: Optional[int],
+    attachment_type: Optional[str],
+) -> None:
+    """Associate each linked row once and fill in its per-file results"""
+    associated = set()
+    for index, media, duplicate in linked:
+        if media.id not in associated:
+            await db.run_sync(
+                associate_media, entity_type, entity_id, media.id, attachment_type
+            )
+            associated.add(media.id)
+        results[index] = {
+            "filename": ingested_files[index].filename,
+            "status": "ok",
+            "id": media.id,
+            "url": media.cloudinary_url,
+            "preview_url": media.preview_url,
+            "resource_type": media.resource_type,
+            "storage_id": media.cloudinary_public_id,
+            "duplicate": duplicate,
+        }
+
+
+@router.post("/upload-batch")
+async def upload_media_batch(
+    files: List[UploadFile] = File(...),
+    entity_type: Optional[str] = Form(None),
+    entity_id: Optional[int] = Form(None),
+    media_type: Optional[str] = Form("general"),
+    attachment_type: Optional[str] = Form("attachment"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Upload several images in one request.
+
+    Each file is streamed and validated on its own; failures are reported per
+    file and do not abort the batch. New content is uploaded concurrently
+    (bounded by the storage service), and all Media rows and associations are
+    written in a single transaction.
+    """
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum per batch: {MAX_BATCH_FILES}",
+        )
+
+    results: List[dict] = [None] * len(files)
+    ingested_files: Dict[int, IngestedUpload] = {}
+
+    try:
+        await _ingest_batch(files, results, ingested_files)
+        existing_by_sha, pending_by_sha = await _find_batch_content(
+            db, ingested_files, current_user.id, media_type
+        )
+        uploaded_by_sha, upload_errors = await _store_new_content(
+            ingested_files, pending_by_sha, current_user.id
+        )
+
+        # Write all rows and associations in one transaction
+        linked = _stage_batch_media(
+            db, ingested_files, existing_by_sha, uploaded_by_sha, upload_errors,
+            results, current_user.id, media_type,
+        )
+        await db.flush()  # Assign IDs without committing
+        await _associate_batch(
+            db, linked, ingested_files, results, entity_type, entity_id, attachment_type
+        )
+        await db.commit()
+
+    except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        for ingested in ingested_files.values():
+            ingested.close()
+
+    return {
+        "uploaded": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] == "error"),
+        "results": results,
+    }
+
+
+async def _delete_stored_asset(media: models.Media, db: AsyncSession) -> None:
+    """Delete a media row's stored asset and variants unless another row shares them
+
+    Storage failures are logged; the database delete goes ahead regardless.
+    """
+    # Content deduplication lets several rows share one remote asset;
+    # only delete it from Cloudinary when this is the last reference
+    shared_refs = await db.scalar(
+        select(func.count()).select_from(models.Media).where(
+            models.Media.cloudinary_public_id == media.cloudinary_public_id,
+            models.Media.id != media.id,
+        )
+    )
+    if shared_refs:
+        logger.debug(f"Asset {media.cloudinary_public_id} still used by {shared_refs} media, keeping it")
+        return
+
+    # Delete image from Cloudinary (non-blocking)
+    print(f"DEBUG: Deleting from Cloudinary: {media.cloudinary_public_id}")
+    try:
+        deleted = await storage_service.delete_image_async(media.cloudinary_public_id)
+        if deleted:
+            print(f"DEBUG: Cloudinary delete successful")
+        else:
+            print(f"DEBUG: Cloudinary delete failed, but continuing with database delete")
+    except Exception as cloudinary_error:
+        print(f"DEBUG: Cloudinary delete error: {cloudinary_error}, but continuing with database delete")
+
+    # Locally generated variants belong to the same asset;
+    # Cloudinary transformation URLs have nothing stored
+    for variant in ((media.file_metadata or {}).get("variants") or {}).values():
+        if not variant.get("storage_id"):
+            continue
+        try:
+            await storage_service.delete_image_async(variant["storage_id"])
+        except Exception as variant_error:
+            logger.warning(f"Failed to delete media variant {variant['storage_id']}: {variant_error}")
 
 
 @router.delete("/{media_id}")
 async def delete_media(
     media_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """Delete media"""
     try:
         # Get media info using ORM
-        media = db.query(models.Media).filter(models.Media.id == media_id).first()
+        media = await db.get(models.Media, media_id)
 
         if not media:
             raise HTTPException(status_code=404, detail="Media not found")
@@ -161,36 +526,32 @@ async def delete_media(
         print(f"DEBUG: Clearing foreign key references for media {media_id}")
         
         # First, clear any main_image_id references to this media
-        profile_updates = db.query(models.UserProfile).filter(
-            models.UserProfile.main_image_id == media_id
-        ).update({"main_image_id": None})
-        print(f"DEBUG: Cleared {profile_updates} profile references")
+        profile_updates = await db.execute(
+            update(models.UserProfile)
+            .where(models.UserProfile.main_image_id == media_id)
+            .values(main_image_id=None)
+        )
+        print(f"DEBUG: Cleared {profile_updates.rowcount} profile references")
         
         # Update projects that reference this media  
-        project_updates = db.query(models.Project).filter(
-            models.Project.main_image_id == media_id
-        ).update({"main_image_id": None})
-        print(f"DEBUG: Cleared {project_updates} project references")
+        project_updates = await db.execute(
+            update(models.Project)
+            .where(models.Project.main_image_id == media_id)
+            .values(main_image_id=None)
+        )
+        print(f"DEBUG: Cleared {project_updates.rowcount} project references")
         
         # Commit the reference clearing
-        db.commit()
+        await db.commit()
         print(f"DEBUG: Committed reference clearing")
         
-        # Delete image from Cloudinary (non-blocking)
-        print(f"DEBUG: Deleting from Cloudinary: {media.cloudinary_public_id}")
-        try:
-            deleted = storage_service.delete_image(media.cloudinary_public_id)
-            if deleted:
-                print(f"DEBUG: Cloudinary delete successful")
-            else:
-                print(f"DEBUG: Cloudinary delete failed, but continuing with database delete")
-        except Exception as cloudinary_error:
-            print(f"DEBUG: Cloudinary delete error: {cloudinary_error}, but continuing with database delete")
+        await _delete_stored_asset(media, db)
 
         # Delete from database using ORM (associations will cascade delete automatically)
         print(f"DEBUG: Deleting from database")
-        db.delete(media)
-        db.commit()
+        await db.delete(media)
+        await db.commit()
+        media_url_cache.invalidate(media_id)
         print(f"DEBUG: Database delete successful")
 
         return {"message": "Media deleted successfully"}
@@ -200,31 +561,39 @@ async def delete_media(
         raise
     except Exception as e:
         # Log and handle unexpected errors
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete media: {str(e)}")
 
 
+@router.get("/metrics/storage")
+async def get_storage_metrics(
+    current_user: models.User = Depends(get_current_user),
+):
+    """Storage I/O timings and concurrency for this worker"""
+    return storage_service.metrics.snapshot()
+
+
 @router.get("/projects/{project_id}")
 async def get_project_media(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> List[dict]:
     """Get all media for a project"""
     # Use ORM with proper joins
-    project_media_query = db.query(
+    project_media_query = await db.execute(select(
         models.Media,
         models.ProjectMedia.media_type,
         models.ProjectMedia.display_order,
         models.ProjectMedia.caption
     ).join(
         models.ProjectMedia, models.Media.id == models.ProjectMedia.media_id
-    ).filter(
+    ).where(
         models.ProjectMedia.project_id == project_id
     ).order_by(
         models.ProjectMedia.display_order.asc().nulls_last(),
         models.Media.id
-    ).all()
+    ))
 
     media_list = []
     for media, media_type, display_order, caption in project_media_query:
@@ -247,23 +616,23 @@ async def get_project_media(
 @router.get("/profiles/{profile_id}")
 async def get_profile_media(
     profile_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> List[dict]:
     """Get all media for a profile"""
     # Use ORM with proper joins
-    profile_media_query = db.query(
+    profile_media_query = await db.execute(select(
         models.Media,
         models.ProfileMedia.media_type,
         models.ProfileMedia.is_primary
     ).join(
         models.ProfileMedia, models.Media.id == models.ProfileMedia.media_id
-    ).filter(
+    ).where(
         models.ProfileMedia.profile_id == profile_id
     ).order_by(
         models.ProfileMedia.is_primary.desc(),
         models.Media.id
-    ).all()
+    ))
 
     media_list = []
     for media, media_type, is_primary in profile_media_query:
@@ -284,92 +653,135 @@ async def get_profile_media(
 
 @router.get("/")
 async def get_all_media(
+    response: Response,
     media_type: Optional[str] = None,  # Filter by 'project', 'profile', 'general', or None for all
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user),
 ) -> List[dict]:
-    """Get all media for current user (for MediaPicker) with optional filtering"""
-    # Use ORM query with optional media_type filter
-    query = db.query(models.Media).filter(
-        models.Media.uploaded_by == current_user.id
-    )
-    
-    if media_type:
-        query = query.filter(models.Media.media_type == media_type)
-    
-    media_objects = query.order_by(models.Media.uploaded_at.desc()).all()
+    """Get media for current user (for MediaPicker) with optional filtering
+
+    Newest first, one page at a time. When more media exist, the cursor for
+    the next page is returned in the X-Next-Cursor header.
+    """
+    # Lean projection: only the columns the picker shows, never the full
+    # file_metadata document
+    original_filename = models.Media.file_metadata["original_filename"].as_string()
+
+    def fetch_page(session: Session):
+        query = session.query(
+            models.Media.id,
+            models.Media.cloudinary_url,
+            models.Media.preview_url,
+            models.Media.resource_type,
+            models.Media.media_type,
+            models.Media.format,
+            models.Media.width,
+            models.Media.height,
+            models.Media.uploaded_at,
+            original_filename.label("original_filename"),
+        ).filter(
+            models.Media.uploaded_by == current_user.id
+        )
 
-    media_list = []
-    for media in media_objects:
-        # For compatibility with MediaPicker, add media_uri field
-        file_metadata = media.file_metadata or {}
-        original_filename = file_metadata.get("original_filename", f"media_{media.id}")
-        
-        media_item = {
-            "id": media.id,
-            "cloudinary_url": media.cloudinary_url,
-            "preview_url": media.preview_url,
-            "resource_type": media.resource_type,
-            "media_type": media.media_type,  # Include the new category
-            "format": media.format,
-            "file_metadata": file_metadata,
-            "width": media.width,
-            "height": media.height,
+        if media_type:
+            query = query.filter(models.Media.media_type == media_type)
+
+        return keyset_paginate(
+            query,
+            [models.Media.uploaded_at, models.Media.id],
+            cursor=cursor,
+            limit=limit,
+        )
+
+    try:
+        rows, next_cursor = await db.run_sync(fetch_page)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return [
+        {
+            "id": row.id,
+            "cloudinary_url": row.cloudinary_url,
+            "preview_url": row.preview_url,
+            "resource_type": row.resource_type,
+            "media_type": row.media_type,  # Include the new category
+            "format": row.format,
+            "width": row.width,
+            "height": row.height,
+            "uploaded_at": row.uploaded_at,
             # Legacy compatibility fields
-            "media_uri": media.cloudinary_url,  # For MediaPicker compatibility
-            "original_filename": original_filename,
+            "media_uri": row.cloudinary_url,  # For MediaPicker compatibility
+            "original_filename": row.original_filename or f"media_{row.id}",
         }
-        media_list.append(media_item)
-
-    return media_list
+        for row in rows
+    ]
 
 
 @router.get("/cloudinary/browse")
 async def browse_cloudinary(
     folder: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,  # next_cursor from the previous response
+    max_results: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    """Browse images in Cloudinary that aren't in our database yet"""
+    """Browse images in Cloudinary that aren't in our database yet
+
+    Walks the remote listing page by page. Each remote page is diffed
+    against the database with an indexed IN query for just that page's ids;
+    pages where everything is already imported are skipped (up to a small
+    budget) so the client is not handed empty pages.
+    """
     try:
-        import cloudinary.api
-        
-        # Get images from Cloudinary
-        search_params = {
-            'resource_type': 'image',
-            'max_results': 50,
-        }
-        
-        if folder:
-            search_params['prefix'] = folder
-            
-        result = cloudinary.api.resources(**search_params)
-        
-        # Get existing public_ids from our database to filter out already imported images
-        existing_public_ids = set()
-        existing_media = db.query(models.Media.cloudinary_public_id).all()
-        for media in existing_media:
-            existing_public_ids.add(media[0])
-        
-        # Filter out images that are already in our database
         available_images = []
-        for resource in result.get('resources', []):
-            if resource['public_id'] not in existing_public_ids:
-                available_images.append({
-                    'public_id': resource['public_id'],
-                    'url': resource['secure_url'],
-                    'width': resource.get('width'),
-                    'height': resource.get('height'),
-                    'format': resource.get('format'),
-                    'bytes': resource.get('bytes'),
-                    'created_at': resource.get('created_at'),
-                })
-        
+        pages_read = 0
+
+        while True:
+            cache_key = (folder, cursor, max_results)
+            page = cloudinary_browse_cache.get(cache_key)
+            if page is None:
+                page = await storage_service.list_remote_images_async(
+                    prefix=folder, cursor=cursor, max_results=max_results
+                )
+                cloudinary_browse_cache.set(cache_key, page)
+            pages_read += 1
+
+            page_ids = [resource['public_id'] for resource in page['resources']]
+            existing_public_ids = set()
+            if page_ids:
+                existing_public_ids = set(await db.scalars(
+                    select(models.Media.cloudinary_public_id)
+                    .where(models.Media.cloudinary_public_id.in_(page_ids))
+                ))
+
+            # Filter out images that are already in our database
+            for resource in page['resources']:
+                if resource['public_id'] not in existing_public_ids:
+                    available_images.append({
+                        'public_id': resource['public_id'],
+                        'url': resource['secure_url'],
+                        'width': resource.get('width'),
+                        'height': resource.get('height'),
+                        'format': resource.get('format'),
+                        'bytes': resource.get('bytes'),
+                        'created_at': resource.get('created_at'),
+                    })
+
+            cursor = page['next_cursor']
+            if available_images or not cursor or pages_read >= CLOUDINARY_BROWSE_MAX_PAGES:
+                break
+
         return {
             'images': available_images,
-            'total': len(available_images)
+            'total': len(available_images),
+            'next_cursor': cursor,
         }
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to browse Cloudinary: {str(e)}")
 
@@ -378,20 +790,20 @@ async def browse_cloudinary(
 async def import_from_cloudinary(
     public_id: str = Form(...),
     media_type: str = Form('general'),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """Import an existing Cloudinary image into our database"""
     try:
-        import cloudinary.api
-        
         # Get image details from Cloudinary
-        resource = cloudinary.api.resource(public_id)
+        resource = await storage_service.get_remote_image_async(public_id)
         
         # Check if already exists in our database
-        existing = db.query(models.Media).filter(
-            models.Media.cloudinary_public_id == public_id
-        ).first()
+        existing = await db.scalar(
+            select(models.Media.id).where(
+                models.Media.cloudinary_public_id == public_id
+            ).limit(1)
+        )
         
         if existing:
             raise HTTPException(status_code=409, detail="Image already imported")
@@ -416,8 +828,7 @@ async def import_from_cloudinary(
             }
         )
         db.add(db_media)
-        db.commit()
-        db.refresh(db_media)
+        await db.commit()
         
         return {
             'id': db_media.id,
@@ -429,27 +840,125 @@ async def import_from_cloudinary(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to import image: {str(e)}")
 
 
+@router.get("/files/{storage_key:path}")
+async def get_media_file(storage_key: str):
+    """Serve a file from the local content-addressed store - public like /raw
+
+    FileResponse handles Range requests and uses zero-copy sendfile where the
+    ASGI server supports it. Content never changes for a key, so responses
+    are cacheable forever.
+    """
+    path = storage_service.local.path_for_key(storage_key)
+    if not path or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return FileResponse(
+        path,
+        media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+def _raw_etag(media_id: int, url: str, content_sha256: Optional[str]) -> str:
+    if content_sha256:
+        return f'"{content_sha256}"'
+    return '"' + hashlib.sha256(f"{media_id}:{url}".encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+async def _proxy_upstream(client: httpx.AsyncClient, url: str, headers: dict) -> StreamingResponse:
+    """Stream media bytes from remote storage; storage failures become a 502"""
+    try:
+        upstream = await client.send(client.build_request("GET", url), stream=True)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Failed to fetch media from storage")
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        raise HTTPException(status_code=502, detail="Failed to fetch media from storage")
+    return StreamingResponse(
+        upstream.aiter_bytes(),
+        media_type=upstream.headers.get("content-type", "application/octet-stream"),
+        headers=headers,
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
 @router.get("/{media_id}/raw")
 async def get_media_raw(
     media_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    variant: Optional[str] = None,  # 'thumbnail', 'display' or 'print'
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    """Get media raw URL (redirect to Cloudinary URL) - public endpoint for image display"""
-    # Use ORM query
-    media = db.query(models.Media).filter(models.Media.id == media_id).first()
+    """Get media raw URL (redirect to Cloudinary URL) - public endpoint for image display
+
+    Lookups are cached in-process, so repeat requests (every resume view and
+    PDF render embeds this URL) skip the database. With MEDIA_RAW_MODE=proxy
+    the bytes are streamed through the app's shared HTTP client instead of
+    redirecting. A variant serves the matching locally generated derivative
+    when one exists, falling back to the original.
+    """
+    entry = media_url_cache.get(media_id)
+    if entry is None:
+        row = (await db.execute(select(
+            models.Media.cloudinary_url,
+            models.Media.cloudinary_public_id,
+            models.Media.content_sha256,
+            models.Media.file_metadata,
+        ).where(models.Media.id == media_id))).first()
+
+        if not row:
+            raise HTTPException(status_code=404, detail="Media not found")
+
+        url, storage_id, content_sha256, file_metadata = row
+        entry = {
+            "url": url,
+            "storage_id": storage_id,
+            "etag": _raw_etag(media_id, url, content_sha256),
+            "variants": {
+                name: {
+                    "url": v["url"],
+                    "storage_id": v.get("storage_id"),
+                    "etag": _raw_etag(media_id, v["url"], v.get("content_sha256")),
+                }
+                for name, v in ((file_metadata or {}).get("variants") or {}).items()
+            },
+        }
+        media_url_cache.set(media_id, entry)
 
-    if not media:
-        raise HTTPException(status_code=404, detail="Media not found")
+    if variant and variant in entry["variants"]:
+        entry = entry["variants"][variant]
 
     # Public endpoint - no authentication required for viewing images
     # Cloudinary URLs are already public, so this is just a convenience redirect
+    headers = {
+        "Cache-Control": f"public, max-age={MEDIA_RAW_MAX_AGE}",
+        "ETag": entry["etag"],
+    }
+    if _etag_matches(request, entry["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    if MEDIA_RAW_MODE == "proxy":
+        local_path = storage_service.local.path_for_storage_id(entry["storage_id"])
+        if local_path and os.path.isfile(local_path):
+            return FileResponse(
+                local_path,
+                media_type=mimetypes.guess_type(local_path)[0] or "application/octet-stream",
+                headers=headers,
+            )
 
-    # Redirect to the actual media URL
-    from fastapi.responses import RedirectResponse
-    return RedirectResponse(url=media.cloudinary_url, status_code=307)
-
+        return await _proxy_upstream(request.app.state.media_http_client, entry["url"], headers)
 
+    # Redirect to the actual media URL
+    return RedirectResponse(url=entry["url"], status_code=307, headers=headers)
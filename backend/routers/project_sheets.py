@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import Response
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager, undefer
 from typing import Optional, List
 from datetime import datetime
 
-from .. import crud, models, schemas
-from ..database import get_db
+from .. import models, schemas
+from ..database import get_async_db, get_async_read_db
+from ..pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    InvalidCursor,
+    keyset_paginate,
+)
+from ..services.project_sheet_renderer import project_sheet_renderer
 from .auth import get_current_active_user
 
 router = APIRouter(
@@ -17,46 +27,80 @@ router = APIRouter(
 
 @router.get("/project-sheets")
 async def list_project_sheets(
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_active_user),
 ) -> List[dict]:
-    """List all generated project sheets"""
-    sheets = db.query(models.ProjectSheet).join(
-        models.Project, models.ProjectSheet.project_id == models.Project.id
-    ).filter(
-        models.ProjectSheet.generated_by == current_user.id
-    ).order_by(
-        models.ProjectSheet.created_at.desc()
-    ).all()
-    
-    result = []
-    for sheet in sheets:
-        result.append({
-            "id": sheet.id,
-            "title": sheet.title,
-            "project_id": sheet.project_id,
-            "project_name": sheet.project.name,
-            "status": sheet.status,
-            "created_at": sheet.created_at.isoformat(),
-            "updated_at": sheet.updated_at.isoformat(),
-        })
-    
-    return result
+    """List generated project sheets, newest first
+
+    Only the listed columns are selected (never the rendered HTML or template
+    data), with the project name joined in the same query. When more sheets
+    exist, the cursor for the next page is returned in the X-Next-Cursor
+    header.
+    """
+    def fetch_page(session: Session):
+        query = session.query(
+            models.ProjectSheet.id,
+            models.ProjectSheet.title,
+            models.ProjectSheet.project_id,
+            models.Project.name.label("project_name"),
+            models.ProjectSheet.status,
+            models.ProjectSheet.created_at,
+            models.ProjectSheet.updated_at,
+        ).join(
+            models.Project, models.ProjectSheet.project_id == models.Project.id
+        ).filter(
+            models.ProjectSheet.generated_by == current_user.id
+        )
+        return keyset_paginate(
+            query,
+            [models.ProjectSheet.created_at, models.ProjectSheet.id],
+            cursor=cursor,
+            limit=limit,
+        )
+
+    try:
+        rows, next_cursor = await db.run_sync(fetch_page)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "project_id": row.project_id,
+            "project_name": row.project_name,
+            "status": row.status,
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat(),
+        }
+        for row in rows
+    ]
 
 
 @router.get("/project-sheets/{sheet_id}")
 async def get_project_sheet(
     sheet_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     """Get individual project sheet details"""
-    sheet = db.query(models.ProjectSheet).join(
-        models.Project, models.ProjectSheet.project_id == models.Project.id
-    ).filter(
-        models.ProjectSheet.id == sheet_id,
-        models.ProjectSheet.generated_by == current_user.id
-    ).first()
+    sheet = await db.scalar(
+        select(models.ProjectSheet).join(
+            models.Project, models.ProjectSheet.project_id == models.Project.id
+        ).options(
+            contains_eager(models.ProjectSheet.project),
+            undefer(models.ProjectSheet.generated_content),
+        ).where(
+            models.ProjectSheet.id == sheet_id,
+            models.ProjectSheet.generated_by == current_user.id
+        )
+    )
     
     if not sheet:
         raise HTTPException(status_code=404, detail="Project sheet not found")
@@ -77,103 +121,26 @@ async def get_project_sheet(
 async def create_project_sheet(
     project_id: int,
     request_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     """Create a project sheet record (no PDF generation yet - like resume workflow)"""
     title = request_data.get('title')
-    # Get project with related data
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    
+    # Get project with client, contact and main image in one query
+    project = await db.run_sync(project_sheet_renderer.load_project, project_id)
+
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Get related entities
-    client = None
-    contact = None
-    
-    if project.client_id:
-        client = db.query(models.Client).filter(models.Client.id == project.client_id).first()
-    
-    if project.contact_id:
-        contact = db.query(models.Contact).filter(models.Contact.id == project.contact_id).first()
-    
-    # Get main image URL if exists
-    main_image_url = None
-    if project.main_image_id:
-        media = db.query(models.Media).filter(models.Media.id == project.main_image_id).first()
-        if media:
-            main_image_url = media.cloudinary_url
-    
+
     try:
-        print(f"DEBUG: Starting project sheet generation for project {project_id}")
-        print(f"DEBUG: Project data - name: {project.name}, client_id: {project.client_id}")
-        
-        # Import dependencies first with specific error handling
-        try:
-            from jinja2 import Template
-            print(f"DEBUG: Jinja2 imported successfully")
-        except ImportError as e:
-            print(f"DEBUG: Failed to import Jinja2: {e}")
-            raise HTTPException(status_code=500, detail=f"Template engine not available: {e}")
-            
-        try:
-            from ..services.template_service import template_service
-            print(f"DEBUG: Template service imported successfully")
-        except ImportError as e:
-            print(f"DEBUG: Failed to import template service: {e}")
-            raise HTTPException(status_code=500, detail=f"Template service not available: {e}")
-            
-        try:
-            from ..pdf_generator import generate_pdf_from_html
-            print(f"DEBUG: PDF generator imported successfully")
-        except ImportError as e:
-            print(f"DEBUG: Failed to import PDF generator: {e}")
-            raise HTTPException(status_code=500, detail=f"PDF generator not available: {e}")
-        
-        template_data = {
-            'project': {
-                'name': project.name,
-                'description': project.description,
-                'date': project.date.strftime('%Y-%m-%d') if project.date else None,
-                'contract_value': float(project.contract_value) if project.contract_value else None,
-                'location': project.location,
-                'main_image_url': main_image_url,
-            },
-            'client': {
-                'name': client.client_name if client else None,
-                'website': client.website if client else None,
-                'email': client.main_email if client else None,
-                'phone': client.main_phone if client else None,
-            } if client else None,
-            'contact': {
-                'name': contact.contact_name if contact else None,
-                'email': contact.email if contact else None,
-                'phone': contact.phone if contact else None,
-            } if contact else None,
-            'user': {
-                'name': current_user.full_name,
-                'email': current_user.email,
-            },
-            'generated_date': datetime.now().strftime("%B %d, %Y at %I:%M %p")
-        }
-        
-        print(f"DEBUG: Template data prepared: {template_data}")
-        
         # Render the template to HTML (like resumes)
-        # Load and render template
-        template_content = template_service.load_template("project_sheet_template.html")
-        if not template_content:
-            raise HTTPException(status_code=404, detail="Project sheet template not found")
-        
-        template = Template(template_content)
-        rendered_html = template.render(**template_data)
-        
-        print(f"DEBUG: Template rendered successfully")
-        
+        template_data, rendered_html = project_sheet_renderer.render_project(
+            project, current_user
+        )
+
         # Create ProjectSheet record with rendered HTML (like resumes)
         sheet_title = title or f"{project.name} - Project Sheet"
-        
+
         project_sheet = models.ProjectSheet(
             project_id=project_id,
             title=sheet_title,
@@ -183,11 +150,8 @@ async def create_project_sheet(
             status="generated"
         )
         db.add(project_sheet)
-        db.commit()
-        db.refresh(project_sheet)
-        
-        print(f"DEBUG: ProjectSheet record created with ID: {project_sheet.id}")
-        
+        await db.commit()
+
         # Return the sheet info for frontend navigation
         return {
             "id": project_sheet.id,
@@ -197,24 +161,101 @@ async def create_project_sheet(
             "generated_content": project_sheet.generated_content,  # Include content for frontend
             "message": "Project sheet created successfully"
         }
-        
+
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Project sheet template not found")
     except Exception as e:
-        db.rollback()
-        print(f"DEBUG: Exception during project sheet generation: {str(e)}")
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to generate project sheet: {str(e)}")
 
 
+@router.post("/project-sheets/batch")
+async def create_project_sheets_batch(
+    request: schemas.ProjectSheetBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    """Create project sheets for many projects at once (e.g. for a bid)"""
+    # Keep request order, drop repeated ids
+    project_ids = list(dict.fromkeys(request.project_ids))
+
+    # Projects, clients, contacts and main images in a few set-based queries
+    projects_by_id = {
+        project.id: project
+        for project in await db.run_sync(project_sheet_renderer.load_projects, project_ids)
+    }
+    projects = [projects_by_id[pid] for pid in project_ids if pid in projects_by_id]
+    missing_project_ids = [pid for pid in project_ids if pid not in projects_by_id]
+
+    try:
+        template_data_list = [
+            project_sheet_renderer.build_template_data(project, current_user)
+            for project in projects
+        ]
+        # Render in the worker pool
+        rendered = await project_sheet_renderer.render_many(template_data_list)
+
+        rows = [
+            {
+                "project_id": project.id,
+                "title": f"{project.name} - Project Sheet",
+                "generated_by": current_user.id,
+                "generated_content": rendered_html,
+                "template_data": template_data,
+                "status": "generated",
+            }
+            for project, template_data, rendered_html in zip(
+                projects, template_data_list, rendered
+            )
+        ]
+        # One bulk INSERT ... RETURNING for all sheets
+        sheet_ids = {}
+        if rows:
+            result = await db.execute(
+                insert(models.ProjectSheet).returning(
+                    models.ProjectSheet.id, models.ProjectSheet.project_id
+                ),
+                rows,
+            )
+            sheet_ids = {project_id: sheet_id for sheet_id, project_id in result}
+        await db.commit()
+
+        return {
+            "created": [
+                {
+                    "id": sheet_ids[row["project_id"]],
+                    "title": row["title"],
+                    "project_id": row["project_id"],
+                    "status": row["status"],
+                }
+                for row in rows
+            ],
+            "message": f"Created {len(rows)} project sheets",
+            "missing_project_ids": missing_project_ids,
+        }
+
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Project sheet template not found")
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to generate project sheets: {str(e)}")
+
+
 @router.get("/project-sheets/{sheet_id}/download")
 async def download_project_sheet_pdf(
     sheet_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     """Download project sheet as PDF"""
-    sheet = db.query(models.ProjectSheet).filter(
-        models.ProjectSheet.id == sheet_id,
-        models.ProjectSheet.generated_by == current_user.id
-    ).first()
+    sheet = await db.scalar(
+        select(models.ProjectSheet).options(
+            undefer(models.ProjectSheet.generated_content)
+        ).where(
+            models.ProjectSheet.id == sheet_id,
+            models.ProjectSheet.generated_by == current_user.id
+        )
+    )
     
     if not sheet:
         raise HTTPException(status_code=404, detail="Project sheet not found")
@@ -246,86 +287,39 @@ async def download_project_sheet_pdf(
 @router.put("/project-sheets/{sheet_id}/regenerate")
 async def regenerate_project_sheet(
     sheet_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     """Regenerate an existing project sheet with current project data"""
     # Get the existing sheet
-    sheet = db.query(models.ProjectSheet).filter(
-        models.ProjectSheet.id == sheet_id,
-        models.ProjectSheet.generated_by == current_user.id
-    ).first()
-    
+    sheet = await db.scalar(
+        select(models.ProjectSheet).where(
+            models.ProjectSheet.id == sheet_id,
+            models.ProjectSheet.generated_by == current_user.id
+        )
+    )
+
     if not sheet:
         raise HTTPException(status_code=404, detail="Project sheet not found")
-    
-    # Get current project data
-    project = db.query(models.Project).filter(models.Project.id == sheet.project_id).first()
+
+    # Get current project data with related entities in one query
+    project = await db.run_sync(project_sheet_renderer.load_project, sheet.project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    
+
     try:
-        # Get related entities with current data
-        client = None
-        contact = None
-        
-        if project.client_id:
-            client = db.query(models.Client).filter(models.Client.id == project.client_id).first()
-        
-        if project.contact_id:
-            contact = db.query(models.Contact).filter(models.Contact.id == project.contact_id).first()
-        
-        # Get main image URL if exists
-        main_image_url = None
-        if project.main_image_id:
-            media = db.query(models.Media).filter(models.Media.id == project.main_image_id).first()
-            if media:
-                main_image_url = media.cloudinary_url
-        
-        # Prepare template data with current project information
-        template_data = {
-            'project': {
-                'name': project.name,
-                'description': project.description,
-                'date': project.date.strftime('%Y-%m-%d') if project.date else None,
-                'contract_value': float(project.contract_value) if project.contract_value else None,
-                'location': project.location,
-                'main_image_url': main_image_url,
-            },
-            'client': {
-                'name': client.client_name if client else None,
-                'website': client.website if client else None,
-                'email': client.main_email if client else None,
-                'phone': client.main_phone if client else None,
-            } if client else None,
-            'contact': {
-                'name': contact.contact_name if contact else None,
-                'email': contact.email if contact else None,
-                'phone': contact.phone if contact else None,
-            } if contact else None,
-            'user': {
-                'name': current_user.full_name,
-                'email': current_user.email,
-            },
-            'generated_date': datetime.now().strftime("%B %d, %Y at %I:%M %p")
-        }
-        
         # Render the template with updated data
-        template_content = template_service.load_template("project_sheet_template.html")
-        if not template_content:
-            raise HTTPException(status_code=404, detail="Project sheet template not found")
-        
-        template = Template(template_content)
-        rendered_html = template.render(**template_data)
-        
+        template_data, rendered_html = project_sheet_renderer.render_project(
+            project, current_user
+        )
+
         # Update the existing sheet record
         sheet.generated_content = rendered_html
         sheet.template_data = template_data
         sheet.updated_at = datetime.now()
-        
-        db.commit()
-        db.refresh(sheet)
-        
+
+        await db.commit()
+
         return {
             "id": sheet.id,
             "title": sheet.title,
@@ -334,34 +328,38 @@ async def regenerate_project_sheet(
             "generated_content": sheet.generated_content,
             "message": "Project sheet regenerated successfully"
         }
-        
+
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Project sheet template not found")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to regenerate project sheet: {str(e)}")
 
 
 @router.delete("/project-sheets/{sheet_id}")
 async def delete_project_sheet(
     sheet_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     """Delete a project sheet"""
-    sheet = db.query(models.ProjectSheet).filter(
-        models.ProjectSheet.id == sheet_id,
-        models.ProjectSheet.generated_by == current_user.id
-    ).first()
+    sheet = await db.scalar(
+        select(models.ProjectSheet).where(
+            models.ProjectSheet.id == sheet_id,
+            models.ProjectSheet.generated_by == current_user.id
+        )
+    )
     
     if not sheet:
         raise HTTPException(status_code=404, detail="Project sheet not found")
     
     try:
         # Delete the sheet record (no PDF file to clean up since we generate on-demand)
-        db.delete(sheet)
-        db.commit()
+        await db.delete(sheet)
+        await db.commit()
         
         return {"message": "Project sheet deleted successfully"}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete project sheet: {str(e)}")
\ No newline at end of file
@@ -1,10 +1,11 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_response
 from ..routers.auth import get_current_active_user
 
 router = APIRouter(
@@ -16,12 +17,20 @@ router = APIRouter(
 
 @router.get("/projects", response_model=List[schemas.Project])
 def list_projects(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     q: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    return crud.get_projects(db, skip=skip, limit=limit, q=q)
+    """
+    Projects, newest first; the next page's cursor is in X-Next-Cursor.
+
+    With q, the best matches by name or description instead.
+    """
+    return page_response(
+        response, crud.get_projects(db, cursor=cursor, limit=limit, q=q)
+    )
 
 
 @router.post("/projects", response_model=schemas.Project)
@@ -1,10 +1,12 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas
-from ..database import get_db
+from .. import crud, models, schemas
+from ..database import get_db, get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_response
+from ..services.embeddings import embedding_service
 from ..routers.auth import get_current_active_user
 
 router = APIRouter(
@@ -22,9 +24,16 @@ def create_project_proposal(
 
 
 @router.get("/proposals", response_model=List[schemas.ProjectProposal])
-def get_proposals(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    proposals = crud.get_project_proposals(db, skip=skip, limit=limit)
-    return proposals
+def get_proposals(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    """Proposals, newest first; the next page's cursor is in X-Next-Cursor"""
+    return page_response(
+        response, crud.get_project_proposals(db, cursor=cursor, limit=limit)
+    )
 
 
 @router.put("/proposals/{proposal_id}", response_model=schemas.ProjectProposal)
@@ -47,7 +56,42 @@ def delete_project_proposal(proposal_id: int, db: Session = Depends(get_db)):
     return {"message": "Proposal deleted successfully"}
 
 
-@router.get("/proposals/{proposal_id}/resumes", response_model=List[schemas.Resume])
-def get_resumes_for_proposal(proposal_id: int, db: Session = Depends(get_db)):
+@router.get("/proposals/{proposal_id}/resumes", response_model=List[schemas.ResumeSummary])
+def get_resumes_for_proposal(proposal_id: int, db: Session = Depends(get_read_db)):
     resumes = crud.get_resumes_by_proposal(db, proposal_id)
     return resumes
+
+
+@router.get(
+    "/proposals/{proposal_id}/suggested-experiences",
+    response_model=List[schemas.SuggestedExperience],
+)
+def get_suggested_experiences(
+    proposal_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Experiences most similar to the proposal's text, best match first"""
+    proposal = crud.get_project_proposal(db, proposal_id)
+    if proposal is None:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+
+    try:
+        matches = embedding_service.suggest_experiences(db, proposal, limit=limit)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=503, detail=f"Embedding service error: {str(e)}")
+
+    experiences = {
+        experience.id: experience
+        for experience in db.query(models.Experience)
+        .filter(models.Experience.id.in_([experience_id for experience_id, _ in matches]))
+        .all()
+    }
+    suggestions = []
+    for experience_id, similarity in matches:
+        experience = experiences.get(experience_id)
+        if experience is not None:
+            experience.similarity = similarity
+            suggestions.append(experience)
+    return suggestions
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse, JSONResponse
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
 from io import BytesIO
 from pydantic import BaseModel
 from jinja2 import Template
@@ -9,7 +11,8 @@ from datetime import datetime
 from backend.services.resume_variable_resolver import resolve_resume_variables
 
 from .. import crud, schemas, models
-from ..database import get_db
+from ..database import get_async_db, get_db, get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_response
 from ..pdf_generator import PLAYWRIGHT_AVAILABLE, generate_pdf_from_html
 from ..services.ai_service import ai_service
 from ..routers.auth import get_current_active_user
@@ -55,14 +58,19 @@ class GenerateResumeRequest(BaseModel):
 
 
 # Resume CRUD endpoints
-@router.get("/resumes", response_model=List[schemas.Resume])
-def get_resumes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all resumes"""
-    return crud.get_resumes(db, skip=skip, limit=limit)
+@router.get("/resumes", response_model=List[schemas.ResumeSummary])
+def get_resumes(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    """Get all resumes, newest first; the next page's cursor is in X-Next-Cursor"""
+    return page_response(response, crud.get_resumes(db, cursor=cursor, limit=limit))
 
 
 @router.get("/resumes/{resume_id}")
-def get_resume(resume_id: int, db: Session = Depends(get_db)):
+def get_resume(resume_id: int, db: Session = Depends(get_read_db)):
     """Get a resume with its experience details"""
     resume = crud.get_resume(db, resume_id)
     if not resume:
@@ -325,7 +333,7 @@ def delete_resume(resume_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/resumes/{resume_id}/pdf")
-def generate_resume_pdf(resume_id: int, db: Session = Depends(get_db)):
+def generate_resume_pdf(resume_id: int, db: Session = Depends(get_read_db)):
     """Generate PDF from resume HTML content"""
     resume = crud.get_resume(db, resume_id)
     if not resume:
@@ -365,19 +373,37 @@ def generate_resume_pdf(resume_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
 
 
+async def get_resume_for_rewrite(db: AsyncSession, resume_id: int):
+    """Resume with its experience details and proposal loaded up front
+
+    The AI endpoints run on an AsyncSession, where lazy loads are not
+    available.
+    """
+    return await db.scalar(
+        select(models.Resume)
+        .options(
+            selectinload(models.Resume.resume_experience_details).selectinload(
+                models.ResumeExperienceDetail.experience
+            ),
+            selectinload(models.Resume.project_proposal),
+        )
+        .where(models.Resume.id == resume_id)
+    )
+
+
 # AI-related endpoints
 @router.post("/rewrite-experience")
 async def rewrite_experience_for_proposal(
-    request: ExperienceRewriteRequest, db: Session = Depends(get_db)
+    request: ExperienceRewriteRequest, db: AsyncSession = Depends(get_async_db)
 ):
     """Use AI to rewrite experience description to align with proposal context"""
 
     # Get the resume and experience to ensure they exist
-    resume = crud.get_resume(db, request.resume_id)
+    resume = await get_resume_for_rewrite(db, request.resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    experience = crud.get_experience(db, request.experience_id)
+    experience = await db.get(models.Experience, request.experience_id)
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
 
@@ -404,9 +430,7 @@ async def rewrite_experience_for_proposal(
     if result["success"]:
         # Update the resume_experience with the AI-rewritten description
         resume_experience.ai_rewritten_description = result["content"]
-        db.add(resume_experience)
-        db.commit()
-        db.refresh(resume_experience)
+        await db.commit()
 
         return {
             "rewritten_description": result["content"],
@@ -500,11 +524,11 @@ def update_experience_description(
 
 @router.post("/bulk-ai-rewrite")
 async def bulk_ai_rewrite_experiences(
-    request: BulkAIRewriteRequest, db: Session = Depends(get_db)
+    request: BulkAIRewriteRequest, db: AsyncSession = Depends(get_async_db)
 ):
     """Generate AI rewrites for all experiences in a resume"""
     # Get the resume
-    resume = crud.get_resume(db, request.resume_id)
+    resume = await get_resume_for_rewrite(db, request.resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
@@ -536,7 +560,6 @@ async def bulk_ai_rewrite_experiences(
                 if result["success"]:
                     # Update the resume_experience with the AI-rewritten description
                     resume_experience.ai_rewritten_description = result["content"]
-                    db.add(resume_experience)
 
                     updated_experiences.append(
                         {
@@ -546,7 +569,7 @@ async def bulk_ai_rewrite_experiences(
                         }
                     )
 
-        db.commit()
+        await db.commit()
 
         return {
             "success": True,
@@ -555,7 +578,7 @@ async def bulk_ai_rewrite_experiences(
         }
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return {
             "success": False,
             "message": f"Bulk AI rewriting failed: {str(e)}",
@@ -565,15 +588,15 @@ async def bulk_ai_rewrite_experiences(
 
 @router.post("/single-ai-rewrite")
 async def single_ai_rewrite_experience(
-    request: SingleAIRewriteRequest, db: Session = Depends(get_db)
+    request: SingleAIRewriteRequest, db: AsyncSession = Depends(get_async_db)
 ):
     """Generate AI rewrite for a single experience"""
     # Get the resume and experience to ensure they exist
-    resume = crud.get_resume(db, request.resume_id)
+    resume = await get_resume_for_rewrite(db, request.resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    experience = crud.get_experience(db, request.experience_id)
+    experience = await db.get(models.Experience, request.experience_id)
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
 
@@ -604,9 +627,7 @@ async def single_ai_rewrite_experience(
     if result["success"]:
         # Update the resume_experience with the AI-rewritten description
         resume_experience.ai_rewritten_description = result["content"]
-        db.add(resume_experience)
-        db.commit()
-        db.refresh(resume_experience)
+        await db.commit()
 
         return {
             "success": True,
@@ -687,7 +708,9 @@ def generate_final_resume(
 
 
 @router.post("/ai-rewrite-with-prompt")
-async def ai_rewrite_with_prompt(request: dict, db: Session = Depends(get_db)):
+async def ai_rewrite_with_prompt(
+    request: dict, db: AsyncSession = Depends(get_async_db)
+):
     """Generate AI rewrite with custom prompt"""
     experience_id = request.get("experience_id")
     custom_prompt = request.get("custom_prompt", "").strip()
@@ -699,15 +722,15 @@ async def ai_rewrite_with_prompt(request: dict, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Custom prompt is required")
 
     # Get the experience
-    experience = crud.get_experience(db, experience_id)
+    experience = await db.get(models.Experience, experience_id)
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
 
     # Get the proposal context (assuming we can find it through resumes)
-    resume_exp = (
-        db.query(models.ResumeExperienceDetail)
-        .filter(models.ResumeExperienceDetail.experience_id == experience_id)
-        .first()
+    resume_exp = await db.scalar(
+        select(models.ResumeExperienceDetail)
+        .where(models.ResumeExperienceDetail.experience_id == experience_id)
+        .limit(1)
     )
 
     if not resume_exp:
@@ -715,11 +738,11 @@ async def ai_rewrite_with_prompt(request: dict, db: Session = Depends(get_db)):
             status_code=404, detail="Experience not associated with any resume"
         )
 
-    resume = crud.get_resume(db, resume_exp.resume_id)
+    resume = await db.get(models.Resume, resume_exp.resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    proposal = crud.get_project_proposal(db, resume.project_proposal_id)
+    proposal = await db.get(models.ProjectProposal, resume.project_proposal_id)
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
 
@@ -734,9 +757,7 @@ async def ai_rewrite_with_prompt(request: dict, db: Session = Depends(get_db)):
         if result["success"]:
             # Update the resume experience detail with the new AI description
             resume_exp.ai_rewritten_description = result["content"]
-            db.add(resume_exp)
-            db.commit()
-            db.refresh(resume_exp)
+            await db.commit()
 
             return {
                 "success": True,
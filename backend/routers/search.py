@@ -0,0 +1,131 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import get_read_db
+from ..search import (
+    CLIENT_SEARCH_COLUMNS,
+    PROFILE_SEARCH_COLUMNS,
+    PROJECT_SEARCH_COLUMNS,
+    TYPEAHEAD_LIMIT,
+    set_similarity_threshold,
+    typeahead_filter,
+    typeahead_score,
+)
+from .auth import get_current_active_user
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["search"],
+    dependencies=[Depends(get_current_active_user)],
+)
+
+TYPEAHEAD_TYPES = ("profile", "project", "client")
+
+
+def _typeahead_branch(entity_type, id_column, label, detail, columns, q, limit, *filters):
+    """Top `limit` matches of one entity type, as a UNION ALL member"""
+    score = typeahead_score(columns, q).label("score")
+    stmt = (
+        select(
+            literal(entity_type).label("type"),
+            id_column.label("id"),
+            label.label("label"),
+            detail.label("detail"),
+            score,
+        )
+        .where(typeahead_filter(columns, q), *filters)
+        .order_by(score.desc(), id_column)
+        .limit(limit)
+    )
+    return select(stmt.subquery())
+
+
+@router.get("/typeahead")
+def typeahead_search(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(TYPEAHEAD_LIMIT, ge=1, le=50),
+    types: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    """
+    Top matches across profiles, projects and clients in one query
+
+    Up to `limit` results per type, each with a similarity score, best
+    matches first. Profiles are limited to the current user's own.
+    """
+    q = q.strip()
+    requested = types or list(TYPEAHEAD_TYPES)
+    unknown = [t for t in requested if t not in TYPEAHEAD_TYPES]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown search types: {', '.join(unknown)}"
+        )
+    if not q:
+        return {"query": q, "results": []}
+
+    branches = []
+    if "profile" in requested:
+        branches.append(
+            _typeahead_branch(
+                "profile",
+                models.UserProfile.id,
+                func.coalesce(
+                    models.UserProfile.full_name,
+                    func.concat_ws(" ", models.UserProfile.first_name, models.UserProfile.last_name),
+                ),
+                models.UserProfile.current_title,
+                PROFILE_SEARCH_COLUMNS,
+                q,
+                limit,
+                models.UserProfile.user_id == current_user.id,
+            )
+        )
+    if "project" in requested:
+        branches.append(
+            _typeahead_branch(
+                "project",
+                models.Project.id,
+                models.Project.name,
+                models.Project.location,
+                PROJECT_SEARCH_COLUMNS,
+                q,
+                limit,
+            )
+        )
+    if "client" in requested:
+        branches.append(
+            _typeahead_branch(
+                "client",
+                models.Client.id,
+                models.Client.client_name,
+                models.Client.website,
+                CLIENT_SEARCH_COLUMNS,
+                q,
+                limit,
+            )
+        )
+
+    combined = union_all(*branches).subquery()
+    set_similarity_threshold(db)
+    rows = db.execute(
+        select(combined).order_by(combined.c.score.desc(), combined.c.type, combined.c.id)
+    ).all()
+
+    return {
+        "query": q,
+        "results": [
+            {
+                "type": row.type,
+                "id": row.id,
+                "label": row.label,
+                "detail": row.detail,
+                "score": round(float(row.score or 0), 4),
+            }
+            for row in rows
+        ],
+    }
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from .. import crud, models, schemas
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..routers.auth import get_current_active_user
 from ..services.template_service import template_service
 
@@ -16,12 +16,12 @@ router = APIRouter(
 
 
 @router.get("/templates/default", response_model=schemas.Template)
-def get_default_template(db: Session = Depends(get_db)):
+def get_default_template(db: Session = Depends(get_read_db)):
     return crud.get_default_template(db)
 
 
-@router.get("/templates", response_model=List[schemas.Template])
-def list_templates(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/templates", response_model=List[schemas.TemplateSummary])
+def list_templates(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     # Use CRUD if available, else fallback to direct query (avoids hot-reload mismatch)
     if hasattr(crud, "get_templates"):
         return crud.get_templates(db, skip=skip, limit=limit)
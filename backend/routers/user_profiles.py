@@ -1,10 +1,11 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_response
 from ..routers.auth import get_current_active_user
 
 router = APIRouter(
@@ -16,22 +17,30 @@ router = APIRouter(
 
 @router.get("/user-profiles", response_model=List[schemas.UserProfile])
 def list_user_profiles(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     q: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
     only_mine: bool = True,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_active_user),
 ):
+    """
+    Profiles, newest first; the next page's cursor is in X-Next-Cursor.
+
+    With q, the best matches by name, title or department instead.
+    """
     if only_mine and current_user:
-        return crud.get_user_profiles_for_user(
-            db, user_id=current_user.id, skip=skip, limit=limit, q=q
+        page = crud.get_user_profiles_for_user(
+            db, user_id=current_user.id, cursor=cursor, limit=limit, q=q
         )
-    return crud.get_user_profiles(db, skip=skip, limit=limit, q=q)
+    else:
+        page = crud.get_user_profiles(db, cursor=cursor, limit=limit, q=q)
+    return page_response(response, page)
 
 
 @router.get("/user-profiles/{profile_id}", response_model=schemas.UserProfile)
-def get_user_profile(profile_id: int, db: Session = Depends(get_db)):
+def get_user_profile(profile_id: int, db: Session = Depends(get_read_db)):
     profile = crud.get_user_profile(db, profile_id)
     if not profile:
         raise HTTPException(status_code=404, detail="User profile not found")
@@ -39,7 +48,7 @@ def get_user_profile(profile_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/user-profiles/{profile_id}/full", response_model=schemas.UserProfile)
-def get_user_profile_full(profile_id: int, db: Session = Depends(get_db)):
+def get_user_profile_full(profile_id: int, db: Session = Depends(get_read_db)):
     """Get complete user profile with all experiences and relationships"""
     profile = crud.get_user_profile_full(db, profile_id)
     if not profile:
@@ -79,7 +88,7 @@ def delete_user_profile(profile_id: int, db: Session = Depends(get_db)):
     "/user-profiles/{profile_id}/experiences",
     response_model=List[schemas.ProfileExperience],
 )
-def get_profile_experiences(profile_id: int, db: Session = Depends(get_db)):
+def get_profile_experiences(profile_id: int, db: Session = Depends(get_read_db)):
     """Get all experiences for a profile"""
     return crud.get_profile_experiences_for_profile(db, profile_id)
 
@@ -155,7 +164,7 @@ def reorder_profile_experiences(
 @router.get(
     "/user-profiles/{profile_id}/skills", response_model=List[schemas.ProfileSkill]
 )
-def get_profile_skills(profile_id: int, db: Session = Depends(get_db)):
+def get_profile_skills(profile_id: int, db: Session = Depends(get_read_db)):
     """Get all skills for a profile"""
     return crud.get_profile_skills_for_profile(db, profile_id)
 
@@ -218,7 +227,7 @@ def reorder_profile_skills(
     "/user-profiles/{profile_id}/certifications",
     response_model=List[schemas.ProfileCertification],
 )
-def get_profile_certifications(profile_id: int, db: Session = Depends(get_db)):
+def get_profile_certifications(profile_id: int, db: Session = Depends(get_read_db)):
     """Get all certifications for a profile"""
     return crud.get_profile_certifications_for_profile(db, profile_id)
 
@@ -295,7 +304,7 @@ def reorder_profile_certifications(
     "/user-profiles/{profile_id}/educations",
     response_model=List[schemas.ProfileEducation],
 )
-def get_profile_educations(profile_id: int, db: Session = Depends(get_db)):
+def get_profile_educations(profile_id: int, db: Session = Depends(get_read_db)):
     """Get all education entries for a profile"""
     return crud.get_profile_educations_for_profile(db, profile_id)
 
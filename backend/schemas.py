@@ -174,6 +174,19 @@ class Template(TemplateBase):
         from_attributes = True
 
 
+class TemplateSummary(BaseModel):
+    """Template list item without the template HTML"""
+
+    id: int
+    name: str
+    is_default: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ClientBase(BaseModel):
     client_name: str
     website: Optional[str] = None
@@ -236,6 +249,7 @@ class ExperienceCreate(ExperienceBase):
 
 class Experience(ExperienceBase):
     id: int
+    tag_list: Optional[List[str]] = None  # Parsed tags, maintained by the database
     created_at: datetime
     updated_at: datetime
 
@@ -243,6 +257,20 @@ class Experience(ExperienceBase):
         from_attributes = True
 
 
+class ExperienceSearchResult(Experience):
+    rank: float
+    snippet: Optional[str] = None  # Description excerpt with <mark> highlights
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
+class SuggestedExperience(Experience):
+    similarity: float  # Cosine similarity to the proposal, -1..1
+
+
 class ResumeExperienceDetailBase(BaseModel):
     experience_id: int
     overridden_project_description: Optional[str] = None
@@ -298,6 +326,22 @@ class Resume(ResumeBase):
         from_attributes = True
 
 
+class ResumeSummary(BaseModel):
+    """Resume list item without the generated HTML"""
+
+    id: int
+    project_proposal_id: Optional[int] = None
+    alias: Optional[str] = None
+    template_id: Optional[int] = None
+    user_profile_id: Optional[int] = None
+    status: Optional[str] = "draft"
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # Media schemas
 class MediaBase(BaseModel):
     media_uri: Optional[str] = None
@@ -652,3 +696,8 @@ class Project(ProjectBase):
         if isinstance(v, date):
             return v
         return None
+
+
+# Project sheet schemas
+class ProjectSheetBatchCreate(BaseModel):
+    project_ids: List[int] = Field(..., min_length=1, max_length=200)
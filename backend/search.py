@@ -0,0 +1,92 @@
+"""
+Typeahead matching backed by pg_trgm
+
+Substring (ILIKE '%q%') and fuzzy word-similarity matches over a set of text
+columns. Both predicates are served by the trigram GIN indexes on those
+columns, so they stay fast without a leading-anchored pattern. Results are
+scored with word_similarity so the closest names come first.
+"""
+
+import os
+from typing import Sequence
+
+from sqlalchemy import String, func, literal, or_, text
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Minimum word_similarity for a fuzzy (non-substring) match, 0..1
+TYPEAHEAD_SIMILARITY_THRESHOLD = float(os.getenv("TYPEAHEAD_SIMILARITY_THRESHOLD", "0.3"))
+TYPEAHEAD_LIMIT = 10
+
+# Columns matched per entity; each has a gin_trgm_ops index
+PROFILE_SEARCH_COLUMNS = (
+    models.UserProfile.full_name,
+    models.UserProfile.first_name,
+    models.UserProfile.last_name,
+    models.UserProfile.current_title,
+    models.UserProfile.department,
+)
+PROJECT_SEARCH_COLUMNS = (
+    models.Project.name,
+    models.Project.project_sheet_description,
+)
+CLIENT_SEARCH_COLUMNS = (models.Client.client_name,)
+
+
+def escape_like(value: str, escape: str = "\\") -> str:
+    """Escape LIKE wildcards so user input only matches literally"""
+    return (
+        value.replace(escape, escape * 2)
+        .replace("%", f"{escape}%")
+        .replace("_", f"{escape}_")
+    )
+
+
+def set_similarity_threshold(
+    db: Session, threshold: float = TYPEAHEAD_SIMILARITY_THRESHOLD
+) -> None:
+    """
+    Set the word similarity threshold used by the <% operator.
+
+    The setting is transaction-local. The operator form (rather than
+    comparing word_similarity() to a constant) is what lets Postgres use
+    the trigram indexes for fuzzy matches.
+    """
+    db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {"threshold": str(threshold)},
+    )
+
+
+def typeahead_filter(columns: Sequence, q: str):
+    """WHERE clause matching q as a substring of, or fuzzily within, any column"""
+    pattern = f"%{escape_like(q)}%"
+    return or_(
+        *(column.ilike(pattern, escape="\\") for column in columns),
+        *(word_similar(q, column) for column in columns),
+    )
+
+
+def word_similar(q: str, column):
+    """q <% column: q is similar to some run of words in column"""
+    return literal(q, String).op("<%")(column)
+
+
+def typeahead_score(columns: Sequence, q: str):
+    """Best word similarity between q and any of the columns"""
+    scores = [func.word_similarity(q, func.coalesce(column, "")) for column in columns]
+    return scores[0] if len(scores) == 1 else func.greatest(*scores)
+
+
+def typeahead(query, columns: Sequence, q: str, limit: int = TYPEAHEAD_LIMIT):
+    """
+    Apply typeahead matching and ordering to a query.
+
+    Call set_similarity_threshold() in the same transaction first.
+    """
+    return (
+        query.filter(typeahead_filter(columns, q))
+        .order_by(typeahead_score(columns, q).desc())
+        .limit(limit)
+    )
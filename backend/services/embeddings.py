@@ -0,0 +1,430 @@
+"""
+Text embeddings and semantic matching of proposals to experiences
+
+Experience and proposal texts are embedded by a pluggable embedder and stored
+in the embeddings table as float32 bytes. Experience vectors are kept in an
+in-process NumPy matrix, so ranking the whole library against a proposal is
+one matrix-vector product (brute-force cosine similarity).
+
+Embedders (EMBEDDING_PROVIDER):
+    hashing                local, dependency-free feature hashing (default)
+    sentence-transformers  local CPU model (EMBEDDING_MODEL)
+    openai                 OpenAI-compatible /embeddings API (EMBEDDING_MODEL)
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .. import models
+
+logger = logging.getLogger("app")
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "hashing").lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Most experiences a suggestion request embeds itself; the full library is
+# embedded in the background at startup
+EMBEDDING_REQUEST_REFRESH_LIMIT = int(os.getenv("EMBEDDING_REQUEST_REFRESH_LIMIT", "50"))
+# Longer texts are truncated before embedding
+MAX_EMBEDDING_CHARS = 8000
+
+EXPERIENCE = "experience"
+PROPOSAL = "proposal"
+
+
+class Embedder(ABC):
+    """Turns texts into L2-normalized float32 vectors"""
+
+    name: str = ""
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a (len(texts), dimensions) float32 array of unit vectors"""
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEmbedder(Embedder):
+    """
+    Local bag-of-words embedder using signed feature hashing
+
+    Words and word pairs are hashed into a fixed number of dimensions and
+    weighted by log term frequency. It needs no model download and captures
+    shared vocabulary rather than meaning; use a model-based embedder for
+    real semantic matching.
+    """
+
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+        self.name = f"hashing:{dimensions}"
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dimensions] += sign
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Local CPU embedding model via the optional sentence-transformers package"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            list(texts), batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True
+        )
+        return _normalize(vectors)
+
+
+class OpenAIEmbedder(Embedder):
+    """Embeddings from an OpenAI-compatible /embeddings endpoint"""
+
+    def __init__(self, model_name: str = "text-embedding-3-small"):
+        self.model_name = model_name
+        self.api_key = os.getenv("EMBEDDING_API_KEY") or os.getenv("OPENAI_API_KEY")
+        self.base_url = os.getenv("EMBEDDING_API_BASE", "https://api.openai.com/v1")
+        self.name = f"openai:{model_name}"
+        if not self.api_key:
+            raise RuntimeError("Set EMBEDDING_API_KEY or OPENAI_API_KEY for OpenAI embeddings")
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        with httpx.Client(timeout=60.0) as client:
+            response = client.post(
+                f"{self.base_url}/embeddings",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json={"model": self.model_name, "input": list(texts)},
+            )
+            response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return _normalize([item["embedding"] for item in data])
+
+
+def get_embedder() -> Embedder:
+    """Embedder configured by EMBEDDING_PROVIDER; falls back to hashing"""
+    try:
+        if EMBEDDING_PROVIDER == "sentence-transformers":
+            return SentenceTransformerEmbedder(EMBEDDING_MODEL or "all-MiniLM-L6-v2")
+        if EMBEDDING_PROVIDER == "openai":
+            return OpenAIEmbedder(EMBEDDING_MODEL or "text-embedding-3-small")
+    except Exception as e:
+        logger.warning(f"Embedding provider {EMBEDDING_PROVIDER} unavailable, using hashing: {e}")
+    return HashingEmbedder()
+
+
+def experience_text(experience) -> str:
+    return "\n".join(
+        part for part in (
+            experience.project_name,
+            experience.tags,
+            experience.project_description,
+        ) if part
+    )
+
+
+def proposal_text(proposal: models.ProjectProposal) -> str:
+    return "\n".join(
+        part for part in (
+            proposal.name,
+            proposal.context,
+            proposal.project_brief,
+            proposal.scope,
+        ) if part
+    )
+
+
+def _insert_for(db: Session):
+    """Dialect insert construct supporting ON CONFLICT for the session's database"""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return postgresql_insert
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VectorIndex:
+    """Brute-force cosine similarity over a matrix of unit vectors"""
+
+    def __init__(self, ids: np.ndarray, matrix: np.ndarray):
+        self.ids = ids
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def top_k(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """(id, cosine similarity) of the k nearest vectors, best first"""
+        if not len(self.ids) or k <= 0:
+            return []
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.ids[i]), float(scores[i])) for i in top]
+
+
+class EmbeddingService:
+    """Keeps stored embeddings current and ranks experiences for proposals"""
+
+    def __init__(self):
+        self._embedder: Optional[Embedder] = None
+        self._index: Optional[VectorIndex] = None
+        self._index_version = None
+        self._lock = threading.Lock()
+        # Held by whichever refresh is writing experience embeddings
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        texts = [text[:MAX_EMBEDDING_CHARS] for text in texts]
+        batches = [
+            self.embedder.embed(texts[i:i + EMBEDDING_BATCH_SIZE])
+            for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+        ]
+        return np.vstack(batches)
+
+    def _store(self, db: Session, entity_type: str, items: List[Tuple[int, str]],
+               stored_hashes: Dict[int, str]) -> Dict[int, np.ndarray]:
+        """
+        Embed and upsert (entity_id, text) items whose text changed
+
+        stored_hashes maps entity id -> content hash of its stored vector.
+        Rows are written with INSERT ... ON CONFLICT DO UPDATE, so concurrent
+        refreshes of the same entity never trip the unique index. Returns the
+        new vectors by entity id.
+        """
+        hashed = [(entity_id, text, _content_hash(text)) for entity_id, text in items]
+        to_embed = [item for item in hashed if stored_hashes.get(item[0]) != item[2]]
+        vectors = self._embed([text for _, text, _ in to_embed]) if to_embed else []
+
+        if to_embed:
+            values = [
+                {
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "model": self.embedder.name,
+                    "dimensions": int(vector.shape[0]),
+                    "content_sha256": sha,
+                    "vector": vector.astype(np.float32).tobytes(),
+                }
+                for (entity_id, _text, sha), vector in zip(to_embed, vectors)
+            ]
+            stmt = _insert_for(db)(models.Embedding).values(values)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["entity_type", "model", "entity_id"],
+                    set_={
+                        "dimensions": stmt.excluded.dimensions,
+                        "content_sha256": stmt.excluded.content_sha256,
+                        "vector": stmt.excluded.vector,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+
+        # Unchanged text: only mark the stored vector as current
+        embedded = {entity_id for entity_id, _, _ in to_embed}
+        unchanged = [entity_id for entity_id, _, _ in hashed if entity_id not in embedded]
+        if unchanged:
+            db.query(models.Embedding).filter(
+                models.Embedding.entity_type == entity_type,
+                models.Embedding.model == self.embedder.name,
+                models.Embedding.entity_id.in_(unchanged),
+            ).update({models.Embedding.updated_at: func.now()}, synchronize_session=False)
+        return {entity_id: vector for (entity_id, _, _), vector in zip(to_embed, vectors)}
+
+    def refresh_experience_embeddings(self, db: Session, limit: Optional[int] = None) -> int:
+        """
+        Embed experiences that are new or changed since their last embedding
+
+        Only live experiences without a current vector are read, at most limit of
+        them when given; returns how many were checked.
+        """
+        model_name = self.embedder.name
+        stale = (
+            db.query(
+                models.Experience.id,
+                models.Experience.project_name,
+                models.Experience.tags,
+                models.Experience.project_description,
+                models.Embedding.content_sha256,
+            )
+            .outerjoin(
+                models.Embedding,
+                and_(
+                    models.Embedding.entity_type == EXPERIENCE,
+                    models.Embedding.model == model_name,
+                    models.Embedding.entity_id == models.Experience.id,
+                ),
+            )
+            .filter(
+                models.Experience.deleted_at.is_(None),
+                or_(
+                    models.Embedding.id.is_(None),
+                    models.Embedding.updated_at < models.Experience.updated_at,
+                )
+            )
+            .order_by(models.Experience.id)
+            .limit(limit)
+            .all()
+        )
+        if not stale:
+            return 0
+
+        stored_hashes = {row.id: row.content_sha256 for row in stale if row.content_sha256}
+        self._store(db, EXPERIENCE, [(row.id, experience_text(row)) for row in stale], stored_hashes)
+        db.commit()
+        return len(stale)
+
+    def start_background_refresh(self, session_factory: Callable[[], Session]) -> threading.Thread:
+        """Embed the whole experience library on a background thread
+
+        Run at startup, so the first suggestion request does not embed every
+        experience while the client waits.
+        """
+
+        def run() -> None:
+            with self._refresh_lock:
+                db = session_factory()
+                try:
+                    count = self.refresh_experience_embeddings(db)
+                    logger.info(f"Embedded {count} new or changed experiences")
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Background embedding refresh failed: {e}")
+                finally:
+                    db.close()
+
+        thread = threading.Thread(target=run, name="embedding-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def proposal_vector(self, db: Session, proposal: models.ProjectProposal) -> np.ndarray:
+        """Stored embedding of a proposal, re-embedded when its text changed"""
+        text = proposal_text(proposal)
+        row = (
+            db.query(models.Embedding)
+            .filter(
+                models.Embedding.entity_type == PROPOSAL,
+                models.Embedding.model == self.embedder.name,
+                models.Embedding.entity_id == proposal.id,
+            )
+            .first()
+        )
+        if row is None or row.content_sha256 != _content_hash(text):
+            stored_hashes = {proposal.id: row.content_sha256} if row else {}
+            vectors = self._store(db, PROPOSAL, [(proposal.id, text)], stored_hashes)
+            db.commit()
+            return vectors[proposal.id]
+        return np.frombuffer(row.vector, dtype=np.float32)
+
+    def experience_index(self, db: Session) -> VectorIndex:
+        """
+        In-memory index of experience vectors
+
+        Soft-deleted experiences are left out. Rebuilt only when the stored
+        experience embeddings change (by count or latest update), which one
+        aggregate query detects.
+        """
+        model_name = self.embedder.name
+        version = tuple(
+            db.query(func.count(models.Embedding.id), func.max(models.Embedding.updated_at))
+            .join(models.Experience, models.Experience.id == models.Embedding.entity_id)
+            .filter(
+                models.Embedding.entity_type == EXPERIENCE,
+                models.Embedding.model == model_name,
+                models.Experience.deleted_at.is_(None),
+            )
+            .one()
+        )
+        with self._lock:
+            if self._index is not None and self._index_version == version:
+                return self._index
+
+        rows = (
+            db.query(models.Embedding.entity_id, models.Embedding.vector)
+            .join(models.Experience, models.Experience.id == models.Embedding.entity_id)
+            .filter(
+                models.Embedding.entity_type == EXPERIENCE,
+                models.Embedding.model == model_name,
+                models.Experience.deleted_at.is_(None),
+            )
+            .all()
+        )
+        if rows:
+            ids = np.fromiter((row.entity_id for row in rows), dtype=np.int64, count=len(rows))
+            matrix = np.vstack([np.frombuffer(row.vector, dtype=np.float32) for row in rows])
+        else:
+            ids = np.empty(0, dtype=np.int64)
+            matrix = np.empty((0, 0), dtype=np.float32)
+        index = VectorIndex(ids, matrix)
+
+        with self._lock:
+            self._index = index
+            self._index_version = version
+        return index
+
+    def suggest_experiences(
+        self, db: Session, proposal: models.ProjectProposal, limit: int = 10
+    ) -> List[Tuple[int, float]]:
+        """
+        (experience id, similarity) of the experiences closest to a proposal
+
+        Embeds a bounded number of recently changed experiences first. While
+        the background refresh is running, ranks the vectors stored so far.
+        """
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh_experience_embeddings(db, limit=EMBEDDING_REQUEST_REFRESH_LIMIT)
+            finally:
+                self._refresh_lock.release()
+        query = self.proposal_vector(db, proposal)
+        return self.experience_index(db).top_k(query, limit)
+
+    def delete_embeddings(self, db: Session, entity_type: str, entity_id: int) -> None:
+        """Remove stored embeddings of a deleted entity (caller commits)"""
+        db.query(models.Embedding).filter(
+            models.Embedding.entity_type == entity_type,
+            models.Embedding.entity_id == entity_id,
+        ).delete(synchronize_session=False)
+
+
+# Global embedding service instance
+embedding_service = EmbeddingService()
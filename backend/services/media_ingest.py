@@ -0,0 +1,129 @@
+"""
+Streaming ingest for uploaded media files
+
+Reads uploads in fixed-size chunks so memory per upload stays constant:
+the size limit is enforced as bytes arrive, the SHA-256 and image format
+are computed on the fly, and content is spooled to a temporary file once it
+grows past a threshold.
+"""
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Iterable, Optional, Set
+
+from fastapi import UploadFile
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_THRESHOLD = int(os.getenv("MEDIA_SPOOL_THRESHOLD", str(1024 * 1024)))  # 1MB
+
+# Bytes needed to recognise every supported signature
+_SNIFF_BYTES = 12
+
+
+class UploadRejected(Exception):
+    """Raised when an upload fails validation during ingest"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class IngestedUpload:
+    file: IO[bytes]
+    filename: str
+    size: int
+    sha256: str
+    format: Optional[str]
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    """Identify an image format from its leading bytes"""
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _check_size(size: int, max_size: int) -> None:
+    if size > max_size:
+        raise UploadRejected(413, f"File too large. Maximum size: {max_size/1024/1024}MB")
+
+
+def _check_format(header: bytes, allowed: Optional[Set[str]]) -> Optional[str]:
+    """Sniff the format from the header, rejecting formats not allowed"""
+    detected_format = sniff_image_format(header)
+    if allowed is not None and detected_format not in allowed:
+        raise UploadRejected(400, "File content is not a supported image format")
+    return detected_format
+
+
+async def ingest_upload(
+    upload: UploadFile,
+    max_size: int,
+    allowed_formats: Optional[Iterable[str]] = None,
+) -> IngestedUpload:
+    """
+    Stream an upload into a spooled temporary file.
+
+    Args:
+        upload: The incoming FastAPI upload
+        max_size: Maximum accepted size in bytes; exceeding it aborts the read
+        allowed_formats: Sniffed formats to accept (None accepts anything)
+
+    Returns:
+        IngestedUpload positioned at the start of the content. The caller is
+        responsible for calling close().
+
+    Raises:
+        UploadRejected: if the file is too large or its header is not allowed
+    """
+    allowed = set(allowed_formats) if allowed_formats is not None else None
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_THRESHOLD)
+    digest = hashlib.sha256()
+    header = b""
+    detected_format = None
+    size = 0
+
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            _check_size(size, max_size)
+
+            if len(header) < _SNIFF_BYTES:
+                header += chunk[: _SNIFF_BYTES - len(header)]
+                if len(header) >= _SNIFF_BYTES:
+                    detected_format = _check_format(header, allowed)
+
+            digest.update(chunk)
+            spool.write(chunk)
+
+        if len(header) < _SNIFF_BYTES:
+            detected_format = _check_format(header, allowed)
+
+        spool.seek(0)
+        return IngestedUpload(
+            file=spool,
+            filename=upload.filename or "",
+            size=size,
+            sha256=digest.hexdigest(),
+            format=detected_format,
+        )
+    except BaseException:
+        spool.close()
+        raise
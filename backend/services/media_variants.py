@@ -0,0 +1,204 @@
+"""
+Local derivative images for uploaded media
+
+Generates right-sized variants (thumbnail, display, print) of uploaded images
+so previews exist as soon as an upload completes, and documents can embed an
+image sized for the page instead of the full original. Resizing is CPU-bound,
+so it runs in a process pool; JPEG sources are decoded with Pillow's draft
+mode, which lets the decoder downscale by a power of two while reading.
+Variants are stored in the local content-addressed store when it can serve
+them (the local backend, or a persistent disk behind MEDIA_PUBLIC_BASE_URL);
+Cloudinary uploads otherwise get Cloudinary transformation URLs instead.
+"""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+from .storage_service import (
+    MEDIA_LOCAL_PERSISTENT,
+    MEDIA_PUBLIC_BASE_URL,
+    CloudinaryBackend,
+    LocalStorageBackend,
+    storage_service,
+)
+
+logger = logging.getLogger("app")
+
+VARIANTS_ENABLED = os.getenv("MEDIA_VARIANTS_ENABLED", "true").lower() == "true"
+VARIANT_WORKERS = int(os.getenv("MEDIA_VARIANT_WORKERS", "2"))
+
+# name -> (width, height, crop). Cropped variants fill the box exactly; the
+# others are scaled to fit inside it and never upscaled.
+VARIANTS = {
+    "thumbnail": (300, 300, True),
+    "display": (1200, 1200, False),
+    "print": (2400, 2400, False),
+}
+JPEG_QUALITY = int(os.getenv("MEDIA_VARIANT_JPEG_QUALITY", "85"))
+
+
+def render_variants(data: bytes) -> Dict[str, Dict]:
+    """
+    Render every configured variant of an image.
+
+    Runs in a worker process, so it only takes and returns plain data.
+    Returns name -> {"data", "format", "width", "height"}; variants that
+    would not be smaller than the original are skipped.
+    """
+    variants = {}
+    for name, (width, height, crop) in VARIANTS.items():
+        with Image.open(io.BytesIO(data)) as img:
+            source_size = img.size
+            if not crop and source_size[0] <= width and source_size[1] <= height:
+                continue
+
+            # JPEG only: decode at the smallest scale still >= the target size
+            img.draft("RGB", (width, height))
+            img = ImageOps.exif_transpose(img)
+
+            has_alpha = img.mode in ("RGBA", "LA") or (
+                img.mode == "P" and "transparency" in img.info
+            )
+            img = img.convert("RGBA" if has_alpha else "RGB")
+
+            if crop:
+                img = ImageOps.fit(img, (width, height), Image.LANCZOS)
+            else:
+                img.thumbnail((width, height), Image.LANCZOS)
+
+            output = io.BytesIO()
+            if has_alpha:
+                img.save(output, "PNG", optimize=True)
+                file_format = "png"
+            else:
+                img.save(output, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                file_format = "jpeg"
+
+            variants[name] = {
+                "data": output.getvalue(),
+                "format": file_format,
+                "width": img.width,
+                "height": img.height,
+            }
+    return variants
+
+
+def local_variants_available() -> bool:
+    """Whether locally stored variants stay reachable for the frontend and PDFs"""
+    if storage_service.backend_name == LocalStorageBackend.storage_type:
+        return True
+    return bool(MEDIA_PUBLIC_BASE_URL) and MEDIA_LOCAL_PERSISTENT
+
+
+def cloudinary_variants(result: Dict) -> Dict[str, Dict]:
+    """Variants of a Cloudinary asset as transformation URLs; nothing is stored"""
+    source_width, source_height = result.get("width"), result.get("height")
+    variants = {}
+    for name, (width, height, crop) in VARIANTS.items():
+        if crop:
+            size = (width, height)
+        elif source_width and source_height:
+            if source_width <= width and source_height <= height:
+                continue
+            scale = min(width / source_width, height / source_height)
+            size = (round(source_width * scale), round(source_height * scale))
+        else:
+            size = (None, None)
+        variants[name] = {
+            "url": CloudinaryBackend.transformation_url(
+                result["storage_id"], width, height, "fill" if crop else "limit"
+            ),
+            "width": size[0],
+            "height": size[1],
+        }
+    return variants
+
+
+class MediaVariantService:
+    """Generates and stores image variants off the event loop"""
+
+    def __init__(self, workers: int = VARIANT_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: a fork of this threaded server could copy
+            # locks held by the database pool or storage threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def store_variants(self, rendered: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Write rendered variants to the local store; returns their metadata"""
+        local = storage_service.local
+        variants = {}
+        for name, variant in rendered.items():
+            stored = local.store_bytes(
+                io.BytesIO(variant["data"]), file_format=variant["format"]
+            )
+            variants[name] = {
+                "storage_id": f"{local.id_prefix}{stored['key']}",
+                "url": local.url_for_key(stored["key"]),
+                "content_sha256": stored["sha256"],
+                "format": variant["format"],
+                "width": variant["width"],
+                "height": variant["height"],
+                "bytes": stored["bytes"],
+            }
+        return variants
+
+    async def generate(self, file, result: Dict) -> Dict[str, Dict]:
+        """
+        Generate variants for an uploaded image.
+
+        Args:
+            file: Readable, seekable file-like object with the original image
+            result: Upload result of the original from the storage service
+
+        Returns:
+            Variant name -> metadata (url, storage_id, width, height, ...).
+            Empty if variants are disabled or the image could not be processed.
+        """
+        if not VARIANTS_ENABLED:
+            return {}
+        if not local_variants_available():
+            if result.get("storage_type") == CloudinaryBackend.storage_type:
+                return cloudinary_variants(result)
+            return {}
+
+        loop = asyncio.get_running_loop()
+        try:
+            file.seek(0)
+            data = await loop.run_in_executor(None, file.read)
+            rendered = await loop.run_in_executor(self.executor, render_variants, data)
+            return await loop.run_in_executor(None, self.store_variants, rendered)
+        except Exception as e:
+            logger.warning(f"Could not generate media variants: {e}")
+            return {}
+
+
+def variant_url(media, variant: str) -> Optional[str]:
+    """URL of a stored variant, falling back to the original image"""
+    if media is None:
+        return None
+    variants = (media.file_metadata or {}).get("variants") or {}
+    url = variants.get(variant, {}).get("url")
+    # Relative URLs (no MEDIA_PUBLIC_BASE_URL) cannot be fetched by the PDF
+    # renderer, so only prefer them over an absolute original when possible
+    if url and (url.startswith("http") or not media.cloudinary_url.startswith("http")):
+        return url
+    return media.cloudinary_url
+
+
+# Singleton instance
+media_variant_service = MediaVariantService()
@@ -1,20 +1,83 @@
-from typing import Dict, List, Optional
-import PyPDF2
-import pdfplumber
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from typing import Dict, List, Optional
+
 import openai
-import os
+import pdfplumber
+import PyPDF2
+from sqlalchemy.orm import Session
+
+from .. import crud, models
+
+# Map-reduce summarization settings. Token counts are estimated from character
+# length, which is close enough for budgeting prompt sizes.
+CHARS_PER_TOKEN = 4
+SUMMARY_CHUNK_TOKENS = int(os.getenv("PDF_SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_WORKERS = int(os.getenv("PDF_SUMMARY_WORKERS", "4"))
+SUMMARY_CACHE_SIZE = int(os.getenv("PDF_SUMMARY_CACHE_SIZE", "2048"))
+
+
+class SummaryCache:
+    """Thread-safe LRU cache of summaries keyed by SHA-256 of the input text"""
+
+    def __init__(self, max_size: int = SUMMARY_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
 
 
 class PDFProcessor:
     def __init__(self, storage_service):
         self.storage_service = storage_service
         self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.summary_cache = SummaryCache()
+
+    def process_pdf(self, s3_key: str, db: Optional[Session] = None) -> Dict:
+        """
+        Process PDF and extract structured information.
 
-    def process_pdf(self, s3_key: str) -> Dict:
-        """Process PDF and extract structured information"""
+        When a database session is given, results are stored in and served
+        from the extraction store keyed by SHA-256 of the PDF bytes. The file
+        is always downloaded, since the object under a key can be replaced.
+        """
         # Download PDF
         pdf_content = self.storage_service.get_pdf_for_processing(s3_key)
+        return self.process_pdf_bytes(pdf_content, db=db)
+
+    def process_pdf_bytes(self, pdf_content: bytes, db: Optional[Session] = None) -> Dict:
+        """Process PDF bytes, reusing a stored extraction for identical content"""
+        content_sha256 = hashlib.sha256(pdf_content).hexdigest()
+
+        if db is not None:
+            extraction = crud.get_pdf_extraction(db, content_sha256)
+            if extraction:
+                return self._extraction_to_result(extraction)
 
         # Extract text
         text = self.extract_text(pdf_content)
@@ -25,7 +88,8 @@ class PDFProcessor:
         # Process with AI if needed
         ai_summary = self.generate_summary(text) if text else None
 
-        return {
+        result = {
+            "content_sha256": content_sha256,
             "text": text,
             "metadata": metadata,
             "summary": ai_summary,
@@ -33,6 +97,35 @@ class PDFProcessor:
             "page_count": metadata.get("page_count", 0),
         }
 
+        if db is not None:
+            crud.create_pdf_extraction(
+                db,
+                content_sha256=content_sha256,
+                text=text,
+                file_metadata=metadata,
+                page_count=result["page_count"],
+                word_count=result["word_count"],
+                summary=ai_summary,
+            )
+
+        return result
+
+    def get_stored_text(self, db: Session, content_sha256: str) -> Optional[str]:
+        """Serve extracted text from the store without touching the original file"""
+        extraction = crud.get_pdf_extraction(db, content_sha256)
+        return extraction.text if extraction else None
+
+    @staticmethod
+    def _extraction_to_result(extraction: models.PdfExtraction) -> Dict:
+        return {
+            "content_sha256": extraction.content_sha256,
+            "text": extraction.text,
+            "metadata": extraction.file_metadata or {},
+            "summary": extraction.summary,
+            "word_count": extraction.word_count or 0,
+            "page_count": extraction.page_count or 0,
+        }
+
     def extract_text(self, pdf_content: bytes) -> str:
         """Extract text from PDF using pdfplumber for better accuracy"""
         text = ""
@@ -80,34 +173,117 @@ class PDFProcessor:
 
         return metadata
 
+    def split_into_chunks(
+        self, text: str, token_budget: int = SUMMARY_CHUNK_TOKENS
+    ) -> List[str]:
+        """
+        Split text into chunks that fit within a token budget.
+
+        Pages and paragraphs (separated by blank lines) are kept whole where
+        possible; only blocks larger than the budget are split further, first
+        on line boundaries and then on hard character limits.
+        """
+        max_chars = max(token_budget * CHARS_PER_TOKEN, 1)
+        blocks = [block.strip() for block in text.split("\n\n") if block.strip()]
+
+        pieces: List[str] = []
+        for block in blocks:
+            if len(block) <= max_chars:
+                pieces.append(block)
+                continue
+            for line in block.split("\n"):
+                while len(line) > max_chars:
+                    pieces.append(line[:max_chars])
+                    line = line[max_chars:]
+                if line.strip():
+                    pieces.append(line)
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_len = 0
+        for piece in pieces:
+            if current and current_len + len(piece) + 2 > max_chars:
+                chunks.append("\n\n".join(current))
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + 2
+        if current:
+            chunks.append("\n\n".join(current))
+
+        return chunks
+
+    def _complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """Run a single chat completion and return the stripped content"""
+        response = self.openai_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=max_tokens,
+            temperature=0.3,
+        )
+        return response.choices[0].message.content.strip()
+
+    def summarize_chunk(self, chunk: str) -> str:
+        """Summarize one chunk (map step), reusing cached results by content hash"""
+        cache_key = SummaryCache.key("chunk", chunk)
+        cached = self.summary_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        summary = self._complete(
+            "You are a professional document summarizer. Summarize this section "
+            "of a larger document, keeping names, figures, dates and key facts.",
+            f"Summarize this section:\n\n{chunk}",
+            max_tokens=300,
+        )
+        self.summary_cache.set(cache_key, summary)
+        return summary
+
     def generate_summary(self, text: str, max_length: int = 500) -> Optional[str]:
-        """Generate AI summary of the document"""
+        """
+        Generate AI summary of the document.
+
+        Long documents are summarized map-reduce style: the text is split into
+        chunks, the chunks are summarized concurrently, and the chunk
+        summaries are combined into the final summary. Chunk and final
+        summaries are cached by content hash, so re-processing an unchanged
+        document makes no API calls.
+        """
         if not text or len(text.strip()) < 100:
             return None
 
+        cache_key = SummaryCache.key("document", str(max_length), text)
+        cached = self.summary_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Truncate text if too long (to avoid token limits)
-            max_input_length = 4000
-            if len(text) > max_input_length:
-                text = text[:max_input_length] + "..."
+            chunks = self.split_into_chunks(text)
 
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional document summarizer. Create concise, informative summaries.",
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Please summarize this document in {max_length} characters or less:\n\n{text}",
-                    },
-                ],
+            # Map: summarize chunks concurrently, then reduce again while the
+            # combined partial summaries still exceed one chunk
+            while len(chunks) > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(SUMMARY_WORKERS, len(chunks))
+                ) as executor:
+                    partials = list(executor.map(self.summarize_chunk, chunks))
+                reduced = self.split_into_chunks("\n\n".join(partials))
+                if len(reduced) >= len(chunks):
+                    # Partial summaries are not shrinking; stop reducing
+                    max_chars = SUMMARY_CHUNK_TOKENS * CHARS_PER_TOKEN
+                    reduced = ["\n\n".join(partials)[:max_chars]]
+                chunks = reduced
+
+            # Reduce: produce the final summary from the remaining chunk
+            summary = self._complete(
+                "You are a professional document summarizer. Create concise, informative summaries.",
+                f"Please summarize this document in {max_length} characters or less:\n\n{chunks[0]}",
                 max_tokens=150,
-                temperature=0.3,
             )
-
-            return response.choices[0].message.content.strip()
+            self.summary_cache.set(cache_key, summary)
+            return summary
 
         except Exception as e:
             print(f"Error generating summary: {e}")
@@ -0,0 +1,138 @@
+"""
+Project sheet rendering service
+
+Loads a project with everything its sheet shows in a single joined query,
+builds the template data and renders it with the compiled project sheet
+template. Used by the create and regenerate endpoints and batch generation.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from .. import models
+from .media_variants import variant_url
+from .template_service import template_service
+
+PROJECT_SHEET_TEMPLATE = "project_sheet_template.html"
+
+
+class ProjectSheetRenderer:
+    """Renders project sheets from current project data"""
+
+    def __init__(self, template_name: str = PROJECT_SHEET_TEMPLATE):
+        self.template_name = template_name
+
+    @staticmethod
+    def load_options():
+        """Loader options that fetch a project's sheet data with the project"""
+        return (
+            joinedload(models.Project.client),
+            joinedload(models.Project.contact),
+            joinedload(models.Project.main_image),
+        )
+
+    def load_project(self, db: Session, project_id: int) -> Optional[models.Project]:
+        """Load a project with its client, contact and main image in one query"""
+        return (
+            db.query(models.Project)
+            .options(*self.load_options())
+            .filter(models.Project.id == project_id)
+            .first()
+        )
+
+    def load_projects(
+        self, db: Session, project_ids: Sequence[int]
+    ) -> List[models.Project]:
+        """
+        Load many projects with their sheet data in set-based queries
+
+        One query for the projects plus one IN query each for clients,
+        contacts and main images, however many projects are requested.
+        """
+        return (
+            db.query(models.Project)
+            .options(
+                selectinload(models.Project.client),
+                selectinload(models.Project.contact),
+                selectinload(models.Project.main_image),
+            )
+            .filter(models.Project.id.in_(project_ids))
+            .all()
+        )
+
+    def build_template_data(
+        self, project: models.Project, user: models.User
+    ) -> Dict[str, Any]:
+        """Template variables for a project; relationships must already be loaded"""
+        client = project.client
+        contact = project.contact
+
+        return {
+            'project': {
+                'name': project.name,
+                'description': project.project_sheet_description,
+                'date': project.date.strftime('%Y-%m-%d') if project.date else None,
+                'contract_value': float(project.contract_value) if project.contract_value else None,
+                'location': project.location,
+                # Right-sized image for print instead of the full original
+                'main_image_url': variant_url(project.main_image, "print"),
+            },
+            'client': {
+                'name': client.client_name,
+                'website': client.website,
+                'email': client.main_email,
+                'phone': client.main_phone,
+            } if client else None,
+            'contact': {
+                'name': contact.contact_name,
+                'email': contact.email,
+                'phone': contact.phone,
+            } if contact else None,
+            'user': {
+                'name': user.full_name,
+                'email': user.email,
+            },
+            'generated_date': datetime.now().strftime("%B %d, %Y at %I:%M %p")
+        }
+
+    def render(self, template_data: Dict[str, Any]) -> str:
+        """
+        Render template data to HTML
+
+        Raises:
+            FileNotFoundError: if the project sheet template is missing
+        """
+        template = template_service.get_compiled_template(self.template_name)
+        if template is None:
+            raise FileNotFoundError(f"Template not found: {self.template_name}")
+        return template.render(**template_data)
+
+    def render_project(self, project: models.Project, user: models.User):
+        """Build template data for a loaded project and render it; returns (data, html)"""
+        template_data = self.build_template_data(project, user)
+        return template_data, self.render(template_data)
+
+    async def render_many(self, template_data_list: List[Dict[str, Any]]) -> List[str]:
+        """
+        Render many sheets off the event loop, on the default thread pool
+
+        Raises:
+            FileNotFoundError: if the project sheet template is missing
+        """
+        if template_service.get_compiled_template(self.template_name) is None:
+            raise FileNotFoundError(f"Template not found: {self.template_name}")
+
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(None, self.render, template_data)
+                for template_data in template_data_list
+            )
+        )
+
+
+# Global renderer instance
+project_sheet_renderer = ProjectSheetRenderer()
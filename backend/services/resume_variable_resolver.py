@@ -88,7 +88,7 @@ class ResumeVariableResolver:
             "about_url": profile.about_url,
             # Image URL
             "main_image_url": (
-                f"http://localhost:8001/api/media/{profile.main_image_id}/raw"
+                f"http://localhost:8001/api/media/{profile.main_image_id}/raw?variant=display"
                 if profile.main_image_id
                 else None
             ),
@@ -146,8 +146,8 @@ class ResumeVariableResolver:
                 f"{date_started or 'N/A'} - {date_completed}" if date_started else None
             )
 
-            # Parse tags
-            tags = [tag.strip() for tag in exp.tags.split(",")] if exp.tags else []
+            # Tags are split out of the tags string by the database
+            tags = list(exp.tag_list or [])
 
             serialized.append(
                 {
@@ -4,7 +4,10 @@ Template loading and management service
 
 import logging
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional, Tuple
+
+from jinja2 import Template
 
 logger = logging.getLogger("app")
 
@@ -16,6 +19,9 @@ class TemplateService:
         self.templates_dir = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates"
         )
+        # template path -> (mtime, compiled template)
+        self._compiled: Dict[str, Tuple[float, Template]] = {}
+        self._compiled_lock = threading.Lock()
 
     def load_template(self, template_name: str) -> Optional[str]:
         """
@@ -47,6 +53,43 @@ class TemplateService:
             logger.error(f"Error loading template {template_name}: {e}")
             return None
 
+    def get_compiled_template(self, template_name: str) -> Optional[Template]:
+        """
+        Get a compiled Jinja2 template for a template file
+
+        Compiled templates are kept in memory and recompiled only when the
+        file's modification time changes.
+
+        Args:
+            template_name: Name of the template file (with or without .html extension)
+
+        Returns:
+            Compiled template, or None if file not found
+        """
+        if not template_name.endswith(".html"):
+            template_name += ".html"
+        template_path = os.path.join(self.templates_dir, template_name)
+
+        try:
+            mtime = os.path.getmtime(template_path)
+        except OSError:
+            logger.warning(f"Template file not found: {template_path}")
+            return None
+
+        with self._compiled_lock:
+            cached = self._compiled.get(template_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        content = self.load_template(template_name)
+        if content is None:
+            return None
+        template = Template(content)
+
+        with self._compiled_lock:
+            self._compiled[template_path] = (mtime, template)
+        return template
+
     def get_default_template_content(self) -> str:
         """
         Get the default resume template content
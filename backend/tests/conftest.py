@@ -0,0 +1,77 @@
+"""
+Test setup: the app against a throwaway sqlite database
+
+Postgres-only column types are mapped to sqlite equivalents, and
+authentication is replaced by a fixed user.
+"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="documaker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import JSON  # noqa: E402
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import SessionLocal, engine  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.routers.auth import get_current_active_user, get_current_user  # noqa: E402
+
+
+@compiles(TSVECTOR, "sqlite")
+def _compile_tsvector(type_, compiler, **kw):
+    return "TEXT"
+
+
+def _create_schema() -> None:
+    for table in models.Base.metadata.tables.values():
+        for column in table.columns:
+            if isinstance(column.type, ARRAY):
+                column.type = JSON()
+            # Generated tsvector columns have no sqlite expression
+            if column.computed is not None:
+                column.computed = None
+                column.server_default = None
+    models.Base.metadata.create_all(engine)
+
+
+_create_schema()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in models.Base.metadata.tables.values():
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def user(db):
+    user = models.User(email="tester@example.com", full_name="Tester", is_active=True)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    return user
+
+
+@pytest.fixture
+def client(user):
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    try:
+        # Not entered as a context manager: startup tasks don't run
+        yield TestClient(app, base_url="http://localhost")
+    finally:
+        app.dependency_overrides.clear()
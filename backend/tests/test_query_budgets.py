@@ -0,0 +1,75 @@
+"""Query ceilings for endpoints that used to issue one query per row"""
+
+from datetime import datetime
+
+from backend import models
+from backend.query_stats import assert_max_queries
+
+
+def _create_sheets(db, user, count):
+    # One shared timestamp, so pages are separated by the id tie-breaker
+    created_at = datetime(2024, 1, 1, 12, 0, 0)
+    projects = [models.Project(name=f"Project {i}") for i in range(count)]
+    db.add_all(projects)
+    db.flush()
+    db.add_all(
+        models.ProjectSheet(
+            project_id=project.id,
+            title=f"Sheet {i}",
+            generated_by=user.id,
+            generated_content="<html></html>",
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        for i, project in enumerate(projects)
+    )
+    db.commit()
+
+
+def test_project_sheet_list_does_not_query_per_sheet(db, client, user):
+    _create_sheets(db, user, 25)
+
+    with assert_max_queries(1):
+        response = client.get("/api/project-sheets")
+
+    assert response.status_code == 200
+    sheets = response.json()
+    assert len(sheets) == 25
+    assert {sheet["project_name"] for sheet in sheets} == {f"Project {i}" for i in range(25)}
+
+
+def test_project_sheet_list_page_query_count_is_constant(db, client, user):
+    _create_sheets(db, user, 30)
+
+    with assert_max_queries(1):
+        first = client.get("/api/project-sheets", params={"limit": 10})
+    with assert_max_queries(1):
+        second = client.get(
+            "/api/project-sheets",
+            params={"limit": 10, "cursor": first.headers["X-Next-Cursor"]},
+        )
+
+    assert second.status_code == 200
+    ids = [sheet["id"] for sheet in first.json() + second.json()]
+    assert len(set(ids)) == 20
+
+
+def test_media_list_does_not_query_per_item(db, client, user):
+    db.add_all(
+        models.Media(
+            cloudinary_public_id=f"images/{i}",
+            cloudinary_url=f"https://example.com/{i}.png",
+            resource_type="image",
+            media_type="general",
+            uploaded_by=user.id,
+            file_metadata={"original_filename": f"{i}.png"},
+        )
+        for i in range(25)
+    )
+    db.commit()
+
+    with assert_max_queries(1):
+        response = client.get("/api/media/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 25
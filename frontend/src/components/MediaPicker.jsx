@@ -8,13 +8,16 @@ function MediaPicker({ value, onChange, mediaType = null, showFilters = true, en
   const [selectedFilter, setSelectedFilter] = useState(mediaType || 'all');
   const [showCloudinaryBrowser, setShowCloudinaryBrowser] = useState(false);
   const [cloudinaryImages, setCloudinaryImages] = useState([]);
+  const [cloudinaryCursor, setCloudinaryCursor] = useState(null);
   const [browsing, setBrowsing] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const backendBase = (typeof import.meta !== 'undefined' && import.meta.env && import.meta.env.VITE_API_BASE) || 'http://localhost:8001';
   const toAbsolute = (uri) => {
     if (!uri) return uri;
     if (uri.startsWith('http')) return uri;
-    if (uri.startsWith('/static/')) return `${backendBase}${uri}`;
+    if (uri.startsWith('/static/') || uri.startsWith('/api/')) return `${backendBase}${uri}`;
     return uri;
   };
 
@@ -36,6 +39,7 @@ function MediaPicker({ value, onChange, mediaType = null, showFilters = true, en
         const queryParam = filterType && filterType !== 'all' ? `?media_type=${filterType}` : '';
         const { response, data } = await api.json(`/api/media${queryParam}`);
         const allMedia = response.ok ? data || [] : [];
+        setNextCursor(response.ok ? response.headers.get('X-Next-Cursor') : null);
         
         // Combine and deduplicate
         const mediaMap = new Map();
@@ -49,20 +53,45 @@ function MediaPicker({ value, onChange, mediaType = null, showFilters = true, en
         const { response, data } = await api.json(`/api/media${queryParam}`);
         if (response.ok) {
           setItems(data || []);
+          setNextCursor(response.headers.get('X-Next-Cursor'));
         }
       }
     } catch (error) {
       // Silently handle errors - don't expose API details
       setItems([]);
+      setNextCursor(null);
     }
   };
 
-  const browseCloudinary = async () => {
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const params = new URLSearchParams({ cursor: nextCursor });
+      if (selectedFilter && selectedFilter !== 'all') params.set('media_type', selectedFilter);
+      const { response, data } = await api.json(`/api/media?${params.toString()}`);
+      if (response.ok) {
+        setItems((current) => {
+          const seen = new Set(current.map((item) => item.id));
+          return [...current, ...(data || []).filter((item) => !seen.has(item.id))];
+        });
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+      }
+    } catch (error) {
+      console.error('Failed to load more media:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const browseCloudinary = async (cursor = null) => {
     setBrowsing(true);
     try {
-      const { response, data } = await api.json('/api/media/cloudinary/browse');
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const { response, data } = await api.json(`/api/media/cloudinary/browse${query}`);
       if (response.ok) {
-        setCloudinaryImages(data.images || []);
+        setCloudinaryImages((current) => (cursor ? [...current, ...(data.images || [])] : data.images || []));
+        setCloudinaryCursor(data.next_cursor || null);
         setShowCloudinaryBrowser(true);
       }
     } catch (error) {
@@ -148,7 +177,7 @@ function MediaPicker({ value, onChange, mediaType = null, showFilters = true, en
           />
           <button 
             className="button-tertiary browse-button"
-            onClick={browseCloudinary}
+            onClick={() => browseCloudinary()}
             disabled={browsing}
           >
             {browsing ? 'Loading...' : 'Browse Cloudinary'}
@@ -180,7 +209,8 @@ function MediaPicker({ value, onChange, mediaType = null, showFilters = true, en
         <div className="media-picker-grid">
           {items.map((item) => {
             const isSelected = value === item.id;
-            const imageUrl = item.media_uri ? toAbsolute(item.media_uri) : `${backendBase}/api/media/${item.id}/raw`;
+            const thumbnailUri = item.preview_url || item.media_uri;
+            const imageUrl = thumbnailUri ? toAbsolute(thumbnailUri) : `${backendBase}/api/media/${item.id}/raw`;
             
             return (
               <div 
@@ -225,6 +255,18 @@ function MediaPicker({ value, onChange, mediaType = null, showFilters = true, en
           <p>Upload your first image using the button above</p>
         </div>
       )}
+
+      {nextCursor && (
+        <div className="media-picker-actions">
+          <button
+            className="button-tertiary load-more"
+            onClick={loadMore}
+            disabled={loadingMore}
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
       
       {value && (
         <div className="media-picker-actions">
@@ -288,6 +330,17 @@ function MediaPicker({ value, onChange, mediaType = null, showFilters = true, en
                     <p>All available images are already imported</p>
                   </div>
                 )}
+                {cloudinaryCursor && (
+                  <div className="media-picker-actions">
+                    <button
+                      className="button-tertiary load-more"
+                      onClick={() => browseCloudinary(cloudinaryCursor)}
+                      disabled={browsing}
+                    >
+                      {browsing ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
               </div>
             </div>
           </div>
@@ -4,6 +4,11 @@ let config = {
   onUnauthorized: null,
 };
 
+// Returned after writes; sent back so reads right after a write are served
+// by the primary database instead of a possibly lagging replica
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+let readPrimaryUntil = null;
+
 function buildHeaders(options = {}) {
   const headers = new Headers(options.headers || {});
   // Default accept JSON
@@ -24,6 +29,10 @@ function buildHeaders(options = {}) {
     }
   } catch (_) { /* ignore */ }
 
+  if (readPrimaryUntil && !headers.has(READ_PRIMARY_HEADER)) {
+    headers.set(READ_PRIMARY_HEADER, readPrimaryUntil);
+  }
+
   return headers;
 }
 
@@ -38,6 +47,9 @@ async function request(path, options = {}) {
 
   const response = await fetch(url, { ...options, headers });
 
+  const until = response.headers.get(READ_PRIMARY_HEADER);
+  if (until) readPrimaryUntil = until;
+
   if (response.status === 401 && typeof config.onUnauthorized === 'function') {
     try { await config.onUnauthorized(); } catch (_) {}
   }
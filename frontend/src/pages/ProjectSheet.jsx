@@ -14,6 +14,8 @@ function ProjectSheet() {
   const toast = useToast();
   const { getProjects, getClients, getContacts } = useData();
   const [projectSheets, setProjectSheets] = useState([]);
+  const [sheetsCursor, setSheetsCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [projects, setProjects] = useState([]);
   const [clients, setClients] = useState([]);
   const [contacts, setContacts] = useState([]);
@@ -43,6 +45,7 @@ function ProjectSheet() {
       
       if (sheetsResponse.response.ok) {
         setProjectSheets(sheetsResponse.data || []);
+        setSheetsCursor(sheetsResponse.response.headers.get('X-Next-Cursor'));
       }
       setProjects(projectsData || []);
       setClients(clientsData || []);
@@ -54,6 +57,22 @@ function ProjectSheet() {
     }
   };
 
+  const loadMoreSheets = async () => {
+    if (!sheetsCursor) return;
+    setLoadingMore(true);
+    try {
+      const { response, data } = await api.json(`/api/project-sheets?cursor=${encodeURIComponent(sheetsCursor)}`);
+      if (response.ok) {
+        setProjectSheets((current) => [...current, ...(data || [])]);
+        setSheetsCursor(response.headers.get('X-Next-Cursor'));
+      }
+    } catch (error) {
+      toast.error('Failed to load more sheets');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCreateSheet = async () => {
     if (!selectedProject) {
       toast.error('Please select a project');
@@ -239,6 +258,13 @@ function ProjectSheet() {
             ))
           )}
         </div>
+        {sheetsCursor && (
+          <div style={{ textAlign: 'center', padding: 'var(--space-md)' }}>
+            <button className="button-secondary" onClick={loadMoreSheets} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* New Sheet Creation Modal */}